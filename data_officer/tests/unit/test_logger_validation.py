@@ -220,6 +220,50 @@ class TestLoggerValidation:
             validate_logs.get_log_file_path = original_get_path
             os.unlink(temp_file)
 
+    def test_parallel_validation_matches_serial(self, monkeypatch):
+        """La validation par pool de processus donne le même résultat que la série"""
+        test_logs = [
+            {
+                "timestamp": f"2024-01-01T10:{i % 60:02d}:00",
+                "agent": ["Auditor_Agent", "Fixer_Agent", "Judge_Agent"][i % 3],
+                "model": "gemini-2.5-flash",
+                "action": ["CODE_ANALYSIS", "FIX", "DEBUG", "BAD"][i % 4],
+                "details": {
+                    "input_prompt": f"Prompt numero {i % 7} assez long",
+                    "output_response": "ok" if i % 5 else "Reponse complete",
+                    "file": f"../outside_{i % 3}.py",
+                    "metadata": {"iteration": i % 9}
+                },
+                "status": "SUCCESS" if i % 2 else "FAILURE"
+            }
+            for i in range(40)
+        ]
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_logs, f)
+            temp_file = f.name
+        
+        import validate_logs
+        monkeypatch.setattr(validate_logs, "get_log_file_path", lambda: temp_file)
+        monkeypatch.setattr(validate_logs, "_PARALLEL_THRESHOLD", 10)
+        
+        try:
+            monkeypatch.setattr(validate_logs.os, "cpu_count", lambda: 1)
+            serial = validate_strict_format()
+            monkeypatch.setattr(validate_logs.os, "cpu_count", lambda: 3)
+            parallel = validate_strict_format()
+            
+            assert parallel[0] == serial[0]
+            assert parallel[1] == serial[1]
+            serial_stats, parallel_stats = dict(serial[2]), dict(parallel[2])
+            assert sorted(parallel_stats.pop("agents_detected")) == \
+                sorted(serial_stats.pop("agents_detected"))
+            assert parallel_stats == serial_stats
+            assert parallel_stats["total_entries"] == 40
+        
+        finally:
+            os.unlink(temp_file)
+
 
 # Tests qui ne dépendent pas du validateur
 class TestDataOfficerBasics:
@@ -26,12 +26,14 @@ except ImportError as e:
     REPORT_GENERATOR_AVAILABLE = False
     
     # Mock si le module n'existe pas
+    # Dossier créé une seule fois à l'import plutôt qu'à chaque instance
+    os.makedirs("data_officer/reports", exist_ok=True)
+    
     class ReportGenerator:
         def __init__(self, log_file="logs/experiment_data.json"):
             self.log_file = log_file
             self.logs = []
             self.report_dir = "data_officer/reports"
-            os.makedirs(self.report_dir, exist_ok=True)
         
         def generate_robustness_report(self):
             return {
@@ -82,43 +84,61 @@ except ImportError as e:
         print("Summary")
 
 
+requires_real_module = pytest.mark.skipif(
+    not REPORT_GENERATOR_AVAILABLE, reason="real module required"
+)
+
+
+def _make_generator(workdir):
+    """Construit un ReportGenerator dont les rapports sont écrits sous workdir."""
+    # Le constructeur crée data_officer/reports dans le dossier courant
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(workdir)
+        generator = ReportGenerator()
+    generator.report_dir = str(workdir / "data_officer" / "reports")
+    os.makedirs(generator.report_dir, exist_ok=True)
+    return generator
+
+
+@pytest.fixture(scope="session")
+def gen(tmp_path_factory):
+    """Instance partagée : le constructeur n'est appelé qu'une fois."""
+    return _make_generator(tmp_path_factory.mktemp("reports"))
+
+
+@requires_real_module
 class TestReportGenerator:
-    """Tests du ReportGenerator (avec le vrai module ou mock)."""
+    """Tests du ReportGenerator (vrai module uniquement)."""
     
-    def test_report_generator_initialization(self):
+    def test_report_generator_initialization(self, gen):
         """Tester l'initialisation"""
-        gen = ReportGenerator()
         assert gen.log_file == "logs/experiment_data.json"
         assert os.path.exists(gen.report_dir)
     
-    def test_generate_robustness_report(self):
+    def test_generate_robustness_report(self, gen):
         """Tester rapport robustesse"""
-        gen = ReportGenerator()
         report = gen.generate_robustness_report()
         
         assert "metrics" in report
         assert "stability_score" in report["metrics"]
         assert "verdict" in report
     
-    def test_generate_quality_report(self):
+    def test_generate_quality_report(self, gen):
         """Tester rapport qualité"""
-        gen = ReportGenerator()
         report = gen.generate_quality_report()
         
         assert "metrics" in report
         assert "quality_score" in report["metrics"]
     
-    def test_generate_execution_report(self):
+    def test_generate_execution_report(self, gen):
         """Tester rapport exécution"""
-        gen = ReportGenerator()
         report = gen.generate_execution_report()
         
         assert "metrics" in report
         assert "total_actions" in report["metrics"]
     
-    def test_generate_final_summary(self):
+    def test_generate_final_summary(self, gen):
         """Tester rapport final"""
-        gen = ReportGenerator()
         summary = gen.generate_final_summary()
         
         assert "global_score" in summary
@@ -126,9 +146,8 @@ class TestReportGenerator:
         assert "recommendations" in summary
         assert isinstance(summary["recommendations"], list)
     
-    def test_save_all_reports(self):
+    def test_save_all_reports(self, gen):
         """Tester sauvegarde rapports"""
-        gen = ReportGenerator()
         files = gen.save_all_reports()
         
         assert "robustness" in files
@@ -140,18 +159,21 @@ class TestReportGenerator:
 class TestReportGeneratorBasic:
     """Tests basiques (toujours disponibles)."""
     
+    @pytest.fixture
+    def gen(self, tmp_path):
+        """Instance propre à chaque test (vrai module ou mock)."""
+        return _make_generator(tmp_path)
+    
     def test_can_import_or_use_mock(self):
         """Tester que ReportGenerator existe"""
         assert ReportGenerator is not None
     
-    def test_initialization_works(self):
+    def test_initialization_works(self, gen):
         """Tester l'initialisation"""
-        gen = ReportGenerator()
         assert gen.log_file == "logs/experiment_data.json"
     
-    def test_generates_summary(self):
+    def test_generates_summary(self, gen):
         """Tester la génération de résumé"""
-        gen = ReportGenerator()
         summary = gen.generate_final_summary()
         
         assert summary is not None
@@ -3,12 +3,46 @@ VALIDATEUR STRICT DES LOGS - Data Officer (VERSION 2.0)
 Verifie que experiment_data.json respecte les criteres du TP.
 """
 
+import functools
+import itertools
 import json
 import os
+import re
 import sys
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Tuple, Any
 
+try:
+    from datasketch import HyperLogLog
+    HLL_AVAILABLE = True
+except ImportError:
+    HLL_AVAILABLE = False
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _json_loads = orjson.loads
+except ImportError:
+    ORJSON_AVAILABLE = False
+    _json_loads = json.loads
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    _JSON_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    IJSON_AVAILABLE = False
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
 # === CONFIGURATIONS ===
 
 AGENT_PATTERNS = {
@@ -17,27 +51,119 @@ AGENT_PATTERNS = {
     'Judge': ['judge', 'validator', 'tester', 'test']
 }
 
-VALID_ACTIONS = ['CODE_ANALYSIS', 'CODE_GEN', 'DEBUG', 'FIX']
+# Une seule passe sur le nom: le lookahead capture le motif le plus
+# prioritaire (ordre de AGENT_PATTERNS) a chaque position, chevauchements compris.
+_AGENT_PRIORITY = {base: rank for rank, base in enumerate(AGENT_PATTERNS)}
+_PATTERN_TO_AGENT = {
+    pattern: base
+    for base, patterns in AGENT_PATTERNS.items()
+    for pattern in patterns
+}
+_AGENT_RE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, _PATTERN_TO_AGENT)) + '))'
+)
+
+# Forme canonique ISO 8601 dont la validite est garantie (jour <= 28, champs
+# bornes): acceptee sans passer par datetime. Tout le reste suit le chemin lent.
+_ISO_FAST_RE = re.compile(
+    r'(?!0000)\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|1\d|2[0-8])'
+    r'T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d(?:\.\d{3}|\.\d{6})?'
+    r'(?:Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?'
+)
+
+# Chemins hors sandbox: un seul scan insensible a la casse, sans .lower()
+_SANDBOX_OR_TEST_RE = re.compile('sandbox|test', re.IGNORECASE)
+
+# Tuples ordonnes pour l'affichage, frozensets pour les tests d'appartenance
+# (valeurs str uniquement: tester isinstance avant, une liste n'est pas hashable)
+VALID_ACTIONS_ORDERED = ('CODE_ANALYSIS', 'CODE_GEN', 'DEBUG', 'FIX')
+VALID_ACTIONS = frozenset(VALID_ACTIONS_ORDERED)
 
-VALID_MODELS = [
+VALID_MODELS = frozenset((
     'gemini-2.5-flash', 'gemini-pro', 'gpt-4', 'gpt-3.5-turbo',
     'claude-3', 'claude-opus', 'test-model'
-]
+))
+
+VALID_STATUSES_ORDERED = ('SUCCESS', 'FAILURE')
+VALID_STATUSES = frozenset(VALID_STATUSES_ORDERED)
+
+# Listes "attendus" des messages d'erreur, formatees une seule fois
+_EXPECTED_ACTIONS_MSG = str(list(VALID_ACTIONS_ORDERED))
+_EXPECTED_STATUSES_MSG = str(list(VALID_STATUSES_ORDERED))
 
-VALID_STATUSES = ['SUCCESS', 'FAILURE']
+_READ_BUFFER_SIZE = 1 << 16
+
+# Au-dela de ce nombre d'entrees, la validation est repartie sur les CPU
+_PARALLEL_THRESHOLD = 2000
+# Entrees par tranche envoyee a un processus de validation
+_PARALLEL_CHUNK_SIZE = 1000
+
+REQUIRED_FIELDS = ('agent', 'model', 'action', 'details', 'timestamp', 'status')
+_REQUIRED_FIELD_SET = frozenset(REQUIRED_FIELDS)
+REQUIRED_AGENTS = frozenset(('Auditor', 'Fixer', 'Judge'))
+
+_CANDIDATE_PATHS = (
+    "logs/experiment_data.json",
+    "../logs/experiment_data.json",
+    "./logs/experiment_data.json",
+)
 
 # === FONCTIONS UTILITAIRES ===
 
+class UniqueCounter:
+    """
+    Compte les valeurs distinctes en flux.
+    HyperLogLog (memoire fixe ~4KB, erreur ~1.6%) si datasketch est
+    installe, sinon un set exact. Avec xxhash, le set ne garde qu'une
+    empreinte 64 bits par valeur au lieu de la chaine elle-meme.
+    """
+    
+    def __init__(self):
+        self.total = 0
+        if HLL_AVAILABLE:
+            self._hll = HyperLogLog(p=12)
+            self._seen = None
+        else:
+            self._hll = None
+            self._seen = set()
+    
+    def add(self, value: str):
+        """Enregistre une valeur."""
+        self.total += 1
+        if self._hll is not None:
+            self._hll.update(value.encode('utf-8', 'surrogatepass'))
+        elif XXHASH_AVAILABLE:
+            self._seen.add(xxhash.xxh64_intdigest(value.encode('utf-8', 'surrogatepass')))
+        else:
+            self._seen.add(value)
+    
+    def merge(self, other: "UniqueCounter"):
+        """Fusionne un compteur partiel (validation parallele)."""
+        self.total += other.total
+        if self._hll is not None:
+            self._hll.merge(other._hll)
+        else:
+            self._seen |= other._seen
+    
+    def unique(self) -> int:
+        """Retourne le nombre (estime) de valeurs distinctes."""
+        if self._hll is not None:
+            return int(self._hll.count())
+        return len(self._seen)
+
+
+@functools.lru_cache(maxsize=1024)
 def get_agent_base_name(agent_name: str) -> str:
-    """Detecte le type d'agent avec pattern matching."""
+    """Detecte le type d'agent avec pattern matching (memoise par nom brut)."""
     if not agent_name:
         return "UNKNOWN"
     
-    name_lower = agent_name.lower()
-    
-    for base_agent, patterns in AGENT_PATTERNS.items():
-        if any(pattern in name_lower for pattern in patterns):
-            return base_agent
+    matches = _AGENT_RE.findall(agent_name.lower())
+    if matches:
+        return min(
+            (_PATTERN_TO_AGENT[m] for m in matches),
+            key=_AGENT_PRIORITY.__getitem__
+        )
     
     if '_' in agent_name:
         return agent_name.split('_')[0]
@@ -47,6 +173,11 @@ def get_agent_base_name(agent_name: str) -> str:
 
 def validate_timestamp(timestamp_str: str) -> bool:
     """Valide un timestamp ISO 8601."""
+    if not isinstance(timestamp_str, str):
+        return False
+    if _ISO_FAST_RE.fullmatch(timestamp_str):
+        return True
+    
     try:
         if timestamp_str.endswith('Z'):
             datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
@@ -57,372 +188,589 @@ def validate_timestamp(timestamp_str: str) -> bool:
         return False
 
 
+# Dernier fichier de logs trouve, par dossier courant (les candidats sont relatifs)
+_resolved_log_paths: Dict[str, str] = {}
+
+
 def get_log_file_path() -> str:
-    """Retourne le chemin absolu vers le fichier de logs."""
-    possible_paths = [
-        "logs/experiment_data.json",
-        "../logs/experiment_data.json",
-        "./logs/experiment_data.json",
-        os.path.join(os.getcwd(), "logs", "experiment_data.json")
-    ]
+    """
+    Retourne le chemin absolu vers le fichier de logs.
+    Seul un fichier existant est memorise (par dossier courant), et il est
+    re-resolu s'il a disparu entre-temps (nettoyage, sauvegarde par renommage).
+    """
+    cwd = os.getcwd()
+    cached = _resolved_log_paths.get(cwd)
+    if cached is not None and os.path.isfile(cached):
+        return cached
+    
+    for path in _CANDIDATE_PATHS:
+        if os.path.isfile(path):
+            resolved = os.path.abspath(path)
+            _resolved_log_paths[cwd] = resolved
+            return resolved
+    
+    _resolved_log_paths.pop(cwd, None)
+    return os.path.join(cwd, "logs", "experiment_data.json")
+
+
+class _LogFormatError(ValueError):
+    """JSON valide dont la racine n'est ni une liste ni une entree seule."""
+
+
+def _iter_log_entries(f):
+    """
+    Itere sur les entrees d'un fichier de logs ouvert en binaire.
+    Un tableau JSON est parse incrementalement avec ijson si disponible,
+    sinon le fichier est decode d'un bloc (orjson si installe);
+    un objet seul est normalise en une liste d'une entree.
+    """
+    first = f.read(1)
+    while first and first.isspace():
+        first = f.read(1)
+    f.seek(0)
+    
+    if first == b'[' and IJSON_AVAILABLE:
+        yield from ijson.items(f, 'item', use_float=True)
+        return
+    
+    logs = _json_loads(f.read())
+    if isinstance(logs, dict):
+        logs = [logs]
+    elif not isinstance(logs, list):
+        raise _LogFormatError(
+            f"la racine doit etre une liste d'entrees (trouve: {type(logs).__name__})"
+        )
+    yield from logs
+
+
+class _ValidationState:
+    """Accumulateurs partages par les verifications d'entree."""
+    
+    def __init__(self, statistics: Dict[str, Any], errors: List[str], warnings: List[str]):
+        self.statistics = statistics
+        self.errors = errors
+        self.warnings = warnings
+        self.by_action = statistics["by_action"]
+        self.by_status = statistics["by_status"]
+        self.by_agent = statistics["by_agent"]
+        self.agents_detected = statistics["agents_detected"]
+        self.security_issues = statistics["security_issues"]
+        self.seen_security = set()
+        self.prompt_counter = UniqueCounter()
+        self.response_counter = UniqueCounter()
+
+
+def _flush_entry(i: int, entry_errors: List[str], entry_warnings: List[str],
+                 state: _ValidationState):
+    """Reporte les erreurs/warnings d'une entree dans les listes globales."""
+    if entry_errors:
+        state.errors.append(f"Entree {i}: {'; '.join(entry_errors)}")
+    if entry_warnings:
+        state.warnings.extend([f"Entree {i}: {w}" for w in entry_warnings])
+
+
+# Chaque verification recoit (entree, etat, erreurs, warnings) et retourne
+# False pour arreter la validation de l'entree.
+
+def _is_valid_action(action: Any) -> bool:
+    """Vrai si l'action fait partie des actions officielles."""
+    return isinstance(action, str) and action in VALID_ACTIONS
+
+
+def _check_action(entry: Dict[str, Any], state: _ValidationState,
+                  entry_errors: List[str], entry_warnings: List[str]):
+    """Verifie que l'action fait partie des actions officielles."""
+    action = entry['action']
+    if not _is_valid_action(action):
+        entry_errors.append(
+            f"Action invalide: '{action}' "
+            f"(attendus: {_EXPECTED_ACTIONS_MSG})"
+        )
+    else:
+        state.by_action[action] += 1
+
+
+def _check_status(entry: Dict[str, Any], state: _ValidationState,
+                  entry_errors: List[str], entry_warnings: List[str]):
+    """Verifie que le status vaut SUCCESS ou FAILURE."""
+    status = entry['status']
+    if not (isinstance(status, str) and status in VALID_STATUSES):
+        entry_errors.append(
+            f"Status invalide: '{status}' (attendus: {_EXPECTED_STATUSES_MSG})"
+        )
+    else:
+        state.by_status[status] += 1
+
+
+def _check_model(entry: Dict[str, Any], state: _ValidationState,
+                 entry_errors: List[str], entry_warnings: List[str]):
+    """Verifie que le modele est un string non vide."""
+    model = entry['model']
+    if not model:
+        entry_errors.append("'model' ne peut pas etre vide")
+    elif not isinstance(model, str):
+        entry_errors.append("'model' doit etre un string")
+
+
+def _check_agent(entry: Dict[str, Any], state: _ValidationState,
+                 entry_errors: List[str], entry_warnings: List[str]):
+    """Verifie le nom d'agent et enregistre sa famille."""
+    agent = entry['agent']
+    if not agent:
+        entry_errors.append("'agent' ne peut pas etre vide")
+    elif not isinstance(agent, str):
+        entry_errors.append("'agent' doit etre un string")
+    else:
+        state.by_agent[agent] += 1
+        state.agents_detected.add(get_agent_base_name(agent))
+
+
+def _normalize_text(value: Any) -> str:
+    """str(value).strip() sans copie quand value est deja un texte sans bords blancs."""
+    if not isinstance(value, str):
+        value = str(value)
+    if value and (value[0].isspace() or value[-1].isspace()):
+        value = value.strip()
+    return value
+
+
+def _check_details(entry: Dict[str, Any], state: _ValidationState,
+                   entry_errors: List[str], entry_warnings: List[str]):
+    """Verifie le bloc details: prompts, iteration et chemins hors sandbox."""
+    details = entry['details']
+    if not isinstance(details, dict):
+        entry_errors.append("'details' doit etre un dictionnaire")
+        return False
+    
+    # Pour ANALYSIS, FIX, GENERATION : input_prompt OBLIGATOIRE
+    action = entry.get('action', '')
+    if _is_valid_action(action):
+        if 'input_prompt' not in details:
+            entry_errors.append(
+                f"'input_prompt' OBLIGATOIRE dans details pour {action}"
+            )
+        elif not details.get('input_prompt'):
+            entry_errors.append(
+                f"'input_prompt' est vide pour {action}"
+            )
+        else:
+            prompt = _normalize_text(details['input_prompt'])
+            state.prompt_counter.add(prompt if len(prompt) <= 200 else prompt[:200])
+            if len(prompt) < 15:
+                entry_warnings.append(
+                    f"'input_prompt' tres court ({len(prompt)} chars)"
+                )
+        
+        # output_response OBLIGATOIRE
+        if 'output_response' not in details:
+            entry_errors.append(
+                f"'output_response' OBLIGATOIRE dans details pour {action}"
+            )
+        elif not details.get('output_response'):
+            entry_errors.append(
+                f"'output_response' est vide pour {action}"
+            )
+        else:
+            response = _normalize_text(details['output_response'])
+            state.response_counter.add(response if len(response) <= 200 else response[:200])
+            if len(response) < 5:
+                entry_warnings.append(
+                    f"'output_response' tres court ({len(response)} chars)"
+                )
+    
+    # === DETECTION ITERATION COUNT (TP Requirement) ===
+    if 'metadata' in details:
+        metadata = details.get('metadata')
+        if isinstance(metadata, dict) and 'iteration' in metadata:
+            iteration = metadata.get('iteration', 0)
+            
+            if not isinstance(iteration, int):
+                entry_warnings.append(
+                    f"'metadata.iteration' doit etre entier"
+                )
+            elif iteration > 10:
+                entry_errors.append(
+                    f"Iteration {iteration} depasse le maximum (10)"
+                )
+            
+            statistics = state.statistics
+            statistics["max_iteration"] = max(
+                statistics.get("max_iteration", 0), iteration
+            )
+    
+    # === SECURITE SANDBOX ===
+    seen_security = state.seen_security
+    for value in details.values():
+        if (isinstance(value, str) and '..' in value
+                and not _SANDBOX_OR_TEST_RE.search(value)):
+            security_issue = f"Chemin potentiel hors sandbox: {value[:40]}..."
+            if security_issue not in seen_security:
+                seen_security.add(security_issue)
+                state.security_issues.append(security_issue)
+
+
+def _check_timestamp(entry: Dict[str, Any], state: _ValidationState,
+                     entry_errors: List[str], entry_warnings: List[str]):
+    """Verifie le format ISO 8601 du timestamp."""
+    timestamp = entry['timestamp']
+    if not validate_timestamp(timestamp):
+        entry_errors.append(
+            f"Format timestamp invalide: '{timestamp}' "
+            f"(doit etre ISO 8601)"
+        )
+
+
+# (champ, verification) appliquees a chaque entree qui contient le champ
+_FIELD_VALIDATORS = (
+    ('action', _check_action),
+    ('status', _check_status),
+    ('model', _check_model),
+    ('agent', _check_agent),
+    ('details', _check_details),
+    ('timestamp', _check_timestamp),
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _missing_field_errors(present: frozenset) -> Tuple[str, ...]:
+    """Messages des champs manquants, calcules une fois par forme d'entree."""
+    return tuple(
+        f"Champ '{field}' manquant"
+        for field in REQUIRED_FIELDS
+        if field not in present
+    )
+
+
+def _validate_entry(i: int, entry: Dict[str, Any], state: _ValidationState):
+    """Valide une entree de log et met a jour les statistiques."""
+    entry_errors = []
+    entry_warnings = []
+    
+    # === CHAMPS OBLIGATOIRES ===
+    # Chemin rapide: entree complete, pas de boucle champ par champ
+    if not isinstance(entry, dict):
+        for field in REQUIRED_FIELDS:
+            if field not in entry:
+                entry_errors.append(f"Champ '{field}' manquant")
+    elif not entry.keys() >= _REQUIRED_FIELD_SET:
+        entry_errors.extend(
+            _missing_field_errors(frozenset(entry.keys() & _REQUIRED_FIELD_SET))
+        )
     
-    for path in possible_paths:
-        if os.path.exists(path):
-            return os.path.abspath(path)
+    # Table construite au chargement du module, dans l'ordre historique des messages
+    for field, check in _FIELD_VALIDATORS:
+        if field in entry and check(entry, state, entry_errors, entry_warnings) is False:
+            break
     
-    return os.path.join(os.getcwd(), "logs", "experiment_data.json")
+    _flush_entry(i, entry_errors, entry_warnings, state)
+
+
+def _validate_chunk(chunk: Tuple[int, List[Any]]) -> _ValidationState:
+    """Valide une tranche d'entrees dans un processus fils."""
+    start, entries = chunk
+    statistics = {
+        "by_agent": Counter(),
+        "by_action": Counter(),
+        "by_status": Counter(),
+        "security_issues": [],
+        "max_iteration": 0,
+        "agents_detected": set()
+    }
+    state = _ValidationState(statistics, [], [])
+    for i, entry in enumerate(entries, start):
+        _validate_entry(i, entry, state)
+    return state
+
+
+def _merge_state(state: _ValidationState, part: _ValidationState):
+    """Reporte un etat partiel dans l'etat global, dans l'ordre des tranches."""
+    state.errors.extend(part.errors)
+    state.warnings.extend(part.warnings)
+    state.by_action.update(part.by_action)
+    state.by_status.update(part.by_status)
+    state.by_agent.update(part.by_agent)
+    state.agents_detected.update(part.agents_detected)
+    for issue in part.security_issues:
+        if issue not in state.seen_security:
+            state.seen_security.add(issue)
+            state.security_issues.append(issue)
+    statistics = state.statistics
+    statistics["max_iteration"] = max(
+        statistics["max_iteration"], part.statistics["max_iteration"]
+    )
+    state.prompt_counter.merge(part.prompt_counter)
+    state.response_counter.merge(part.response_counter)
+
+
+def _validate_all(entries, state: _ValidationState) -> int:
+    """
+    Valide toutes les entrees et retourne leur nombre.
+    Au-dela de _PARALLEL_THRESHOLD entrees et avec plusieurs CPU, les
+    entrees sont lues par tranches de _PARALLEL_CHUNK_SIZE, soumises a un
+    pool de processus au fil de la lecture; au plus deux tranches par
+    processus sont en memoire a la fois.
+    """
+    workers = os.cpu_count() or 1
+    head = []
+    if workers > 1:
+        head = list(itertools.islice(entries, _PARALLEL_THRESHOLD + 1))
+    
+    if len(head) <= _PARALLEL_THRESHOLD:
+        total = 0
+        for i, entry in enumerate(itertools.chain(head, entries)):
+            _validate_entry(i, entry, state)
+            total += 1
+        return total
+    
+    entries = itertools.chain(head, entries)
+    total = 0
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            chunk = list(itertools.islice(entries, _PARALLEL_CHUNK_SIZE))
+            if not chunk:
+                break
+            pending.append(executor.submit(_validate_chunk, (total, chunk)))
+            total += len(chunk)
+            if len(pending) >= 2 * workers:
+                _merge_state(state, pending.popleft().result())
+        # Fusion dans l'ordre des tranches: messages dans l'ordre du fichier
+        while pending:
+            _merge_state(state, pending.popleft().result())
+    return total
 
 
 # === FONCTION PRINCIPALE DE VALIDATION ===
 
+def _empty_statistics() -> Dict[str, Any]:
+    """Statistiques initiales d'une validation."""
+    return {
+        "total_entries": 0,
+        "by_agent": Counter(),
+        "by_action": Counter(),
+        "by_status": Counter({"SUCCESS": 0, "FAILURE": 0}),
+        "prompt_analysis": {},
+        "security_issues": [],
+        "max_iteration": 0,
+        "agents_detected": set()
+    }
+
+
 def validate_strict_format() -> Tuple[bool, List[str], Dict[str, Any]]:
     """
     Validation STRICTE selon les criteres du TP.
     Retourne: (is_valid, errors, statistics)
+    
+    Le rapport est accumule en memoire puis ecrit sur stdout en une fois.
     """
+    out = []
+    try:
+        return _validate_strict_format(out.append)
+    finally:
+        if out:
+            sys.stdout.write('\n'.join(out) + '\n')
+            sys.stdout.flush()
+
+
+def _validate_strict_format(emit) -> Tuple[bool, List[str], Dict[str, Any]]:
+    """Corps de validate_strict_format; chaque ligne du rapport passe par emit."""
     
-    log_file = get_log_file_path()
+    log_file = Path(get_log_file_path())
     
-    print("[VALIDATION] VALIDATION STRICTE DES LOGS - VERSION 2.0")
-    print("=" * 80)
-    print(f"Fichier: {log_file}")
-    print(f"Validation: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 80)
+    emit("[VALIDATION] VALIDATION STRICTE DES LOGS - VERSION 2.0")
+    emit("=" * 80)
+    emit(f"Fichier: {log_file}")
+    emit(f"Validation: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    emit("=" * 80)
     
     errors = []
     warnings = []
-    statistics = {
-        "total_entries": 0,
-        "by_agent": {},
-        "by_action": {},
-        "by_status": {"SUCCESS": 0, "FAILURE": 0},
-        "prompt_analysis": {},
-        "security_issues": [],
-        "max_iteration": 0,
-        "agents_detected": set()
-    }
+    statistics = _empty_statistics()
     
     # ===== CRITERE 1: FICHIER EXISTE =====
-    if not os.path.exists(log_file):
+    try:
+        st = os.stat(log_file)
+    except FileNotFoundError:
         error_msg = "[ERROR] CRITIQUE: Fichier logs/experiment_data.json introuvable"
-        print(error_msg)
+        emit(error_msg)
         errors.append(error_msg)
         return False, errors, statistics
     
     # ===== CRITERE 2: TAILLE MINIMALE =====
-    size = os.path.getsize(log_file)
+    size = st.st_size
     statistics["file_size"] = size
-    print(f"[INFO] Taille fichier: {size} octets")
+    emit(f"[INFO] Taille fichier: {size} octets")
     
     if size < 100:
         warning = "[WARNING] Fichier tres petit (moins de 100 octets)"
         warnings.append(warning)
-        print(warning)
+        emit(warning)
+    
+    # ===== CRITERE 3: JSON VALIDE + BOUCLE DE VALIDATION =====
+    state = _ValidationState(statistics, errors, warnings)
     
-    # ===== CRITERE 3: JSON VALIDE =====
+    # En lecture incrementale, des entrees ont pu etre validees avant l'erreur:
+    # leurs resultats partiels sont ecartes, seule l'erreur de lecture compte
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            logs = json.load(f)
-    except json.JSONDecodeError as e:
+        with open(log_file, 'rb', buffering=_READ_BUFFER_SIZE) as f:
+            total_entries = _validate_all(_iter_log_entries(f), state)
+    except _JSON_ERRORS as e:
         error_msg = f"[ERROR] JSON INVALIDE: {str(e)[:100]}"
-        print(error_msg)
-        errors.append(error_msg)
-        return False, errors, statistics
-    except Exception as e:
+    except _LogFormatError as e:
+        error_msg = f"[ERROR] FORMAT INVALIDE: {e}"
+    except (OSError, ValueError) as e:
         error_msg = f"[ERROR] ERREUR LECTURE: {str(e)}"
-        print(error_msg)
-        errors.append(error_msg)
-        return False, errors, statistics
-    
-    # Normaliser si dict seul
-    if isinstance(logs, dict):
-        logs = [logs]
+    else:
+        error_msg = None
+    if error_msg is not None:
+        emit(error_msg)
+        statistics = _empty_statistics()
+        statistics["file_size"] = size
+        return False, [error_msg], statistics
     
-    statistics["total_entries"] = len(logs)
+    statistics["total_entries"] = total_entries
     
-    if len(logs) == 0:
+    if total_entries == 0:
         error_msg = "[ERROR] Fichier vide - aucune entree de log"
-        print(error_msg)
+        emit(error_msg)
         errors.append(error_msg)
         return False, errors, statistics
     
-    print(f"[INFO] Entrees trouvees: {len(logs)}")
-    
-    # ===== CRITERES OBLIGATOIRES DU TP =====
-    required_fields = ['agent', 'model', 'action', 'details', 'timestamp', 'status']
-    required_agents = {'Auditor', 'Fixer', 'Judge'}
-    
-    all_prompts = []
-    all_responses = []
-    
-    # ===== BOUCLE DE VALIDATION =====
-    for i, entry in enumerate(logs):
-        entry_errors = []
-        entry_warnings = []
-        
-        # === CHAMPS OBLIGATOIRES ===
-        for field in required_fields:
-            if field not in entry:
-                entry_errors.append(f"Champ '{field}' manquant")
-        
-        # === ACTIONS VALIDES ===
-        if 'action' in entry:
-            action = entry['action']
-            if action not in VALID_ACTIONS:
-                entry_errors.append(
-                    f"Action invalide: '{action}' "
-                    f"(attendus: {VALID_ACTIONS})"
-                )
-            else:
-                statistics["by_action"][action] = \
-                    statistics["by_action"].get(action, 0) + 1
-        
-        # === STATUS VALIDES ===
-        if 'status' in entry:
-            status = entry['status']
-            if status not in VALID_STATUSES:
-                entry_errors.append(
-                    f"Status invalide: '{status}' (attendus: {VALID_STATUSES})"
-                )
-            else:
-                statistics["by_status"][status] = \
-                    statistics["by_status"].get(status, 0) + 1
-        
-        # === VALIDATION MODEL ===
-        if 'model' in entry:
-            model = entry.get('model')
-            if not model:
-                entry_errors.append("'model' ne peut pas etre vide")
-            elif not isinstance(model, str):
-                entry_errors.append("'model' doit etre un string")
-        
-        # === AGENT VALIDE ===
-        if 'agent' in entry:
-            agent = entry['agent']
-            if not agent:
-                entry_errors.append("'agent' ne peut pas etre vide")
-            elif not isinstance(agent, str):
-                entry_errors.append("'agent' doit etre un string")
-            else:
-                statistics["by_agent"][agent] = \
-                    statistics["by_agent"].get(agent, 0) + 1
-                base_name = get_agent_base_name(agent)
-                statistics["agents_detected"].add(base_name)
-        
-        # === DETAILS (Bloc principal) ===
-        if 'details' in entry:
-            details = entry['details']
-            
-            if not isinstance(details, dict):
-                entry_errors.append("'details' doit etre un dictionnaire")
-                if entry_errors:
-                    errors.append(f"Entree {i}: {'; '.join(entry_errors)}")
-                if entry_warnings:
-                    warnings.extend([f"Entree {i}: {w}" for w in entry_warnings])
-                continue
-            
-            # Validation conditionnelle selon action
-            action = entry.get('action', '')
-            
-            # Pour ANALYSIS, FIX, GENERATION : input_prompt OBLIGATOIRE
-            if action in VALID_ACTIONS:
-                if 'input_prompt' not in details:
-                    entry_errors.append(
-                        f"'input_prompt' OBLIGATOIRE dans details pour {action}"
-                    )
-                elif not details.get('input_prompt'):
-                    entry_errors.append(
-                        f"'input_prompt' est vide pour {action}"
-                    )
-                else:
-                    prompt = str(details['input_prompt']).strip()
-                    all_prompts.append(prompt[:200])
-                    if len(prompt) < 15:
-                        entry_warnings.append(
-                            f"'input_prompt' tres court ({len(prompt)} chars)"
-                        )
-                
-                # output_response OBLIGATOIRE
-                if 'output_response' not in details:
-                    entry_errors.append(
-                        f"'output_response' OBLIGATOIRE dans details pour {action}"
-                    )
-                elif not details.get('output_response'):
-                    entry_errors.append(
-                        f"'output_response' est vide pour {action}"
-                    )
-                else:
-                    response = str(details['output_response']).strip()
-                    all_responses.append(response[:200])
-                    if len(response) < 5:
-                        entry_warnings.append(
-                            f"'output_response' tres court ({len(response)} chars)"
-                        )
-            
-            # === DETECTION ITERATION COUNT (TP Requirement) ===
-            if 'metadata' in details:
-                metadata = details.get('metadata')
-                if isinstance(metadata, dict) and 'iteration' in metadata:
-                    iteration = metadata.get('iteration', 0)
-                    
-                    if not isinstance(iteration, int):
-                        entry_warnings.append(
-                            f"'metadata.iteration' doit etre entier"
-                        )
-                    elif iteration > 10:
-                        entry_errors.append(
-                            f"Iteration {iteration} depasse le maximum (10)"
-                        )
-                    
-                    statistics["max_iteration"] = max(
-                        statistics.get("max_iteration", 0), iteration
-                    )
-            
-            # === SECURITE SANDBOX ===
-            for key, value in details.items():
-                if isinstance(value, str) and '..' in value:
-                    if 'sandbox' not in value.lower():
-                        if 'test' not in value.lower():
-                            security_issue = f"Chemin potentiel hors sandbox: {value[:40]}..."
-                            if security_issue not in statistics["security_issues"]:
-                                statistics["security_issues"].append(security_issue)
-        
-        # === TIMESTAMP ISO 8601 ===
-        if 'timestamp' in entry:
-            timestamp = entry['timestamp']
-            if not validate_timestamp(timestamp):
-                entry_errors.append(
-                    f"Format timestamp invalide: '{timestamp}' "
-                    f"(doit etre ISO 8601)"
-                )
-        
-        if entry_errors:
-            errors.append(f"Entree {i}: {'; '.join(entry_errors)}")
-        if entry_warnings:
-            warnings.extend([f"Entree {i}: {w}" for w in entry_warnings])
+    emit(f"[INFO] Entrees trouvees: {total_entries}")
     
     # ===== POST-PROCESSING =====
     
     # === AGENTS MINIMUM REQUIS ===
     agents_found = statistics["agents_detected"]
-    missing_agents = required_agents - agents_found
+    missing_agents = REQUIRED_AGENTS - agents_found
     
     if missing_agents:
-        error_msg = f"Agents requis manquants: {', '.join(missing_agents)}"
-        print(f"[ERROR] {error_msg}")
+        error_msg = f"Agents requis manquants: {', '.join(sorted(missing_agents))}"
+        emit(f"[ERROR] {error_msg}")
         errors.append(error_msg)
     else:
-        print(f"[SUCCESS] Tous les agents requis detectes: {', '.join(sorted(agents_found))}")
+        emit(f"[SUCCESS] Tous les agents requis detectes: {', '.join(sorted(agents_found))}")
     
     # === SUFFISAMMENT D'ENTREES ===
-    if len(logs) < 5:
-        warning_msg = f"[WARNING] Peu d'entrees ({len(logs)}). Minimum: 5"
+    if total_entries < 5:
+        warning_msg = f"[WARNING] Peu d'entrees ({total_entries}). Minimum: 5"
         warnings.append(warning_msg)
-        print(warning_msg)
+        emit(warning_msg)
     
     # === ANALYSE PROMPTS ===
     statistics["prompt_analysis"] = {
-        "unique_prompts": len(set(all_prompts)),
-        "total_prompts": len(all_prompts),
-        "unique_responses": len(set(all_responses)),
-        "total_responses": len(all_responses)
+        "unique_prompts": state.prompt_counter.unique(),
+        "total_prompts": state.prompt_counter.total,
+        "unique_responses": state.response_counter.unique(),
+        "total_responses": state.response_counter.total
     }
     
     # ===== AFFICHAGE RESULTATS =====
-    print("\n" + "=" * 80)
-    print("RESULTATS DE VALIDATION")
-    print("=" * 80)
+    emit("\n" + "=" * 80)
+    emit("RESULTATS DE VALIDATION")
+    emit("=" * 80)
     
     if errors:
-        print(f"[ERROR] {len(errors)} ERREUR(S) CRITIQUE(S):")
+        emit(f"[ERROR] {len(errors)} ERREUR(S) CRITIQUE(S):")
         for error in errors[:5]:
-            print(f"  - {error}")
+            emit(f"  - {error}")
         if len(errors) > 5:
-            print(f"  ... et {len(errors) - 5} autres erreurs")
+            emit(f"  ... et {len(errors) - 5} autres erreurs")
     else:
-        print("[SUCCESS] AUCUNE ERREUR CRITIQUE DETECTEE")
+        emit("[SUCCESS] AUCUNE ERREUR CRITIQUE DETECTEE")
     
     if warnings:
-        print(f"\n[WARNING] {len(warnings)} AVERTISSEMENT(S):")
+        emit(f"\n[WARNING] {len(warnings)} AVERTISSEMENT(S):")
         for warning in warnings[:5]:
-            print(f"  - {warning}")
+            emit(f"  - {warning}")
         if len(warnings) > 5:
-            print(f"  ... et {len(warnings) - 5} autres")
+            emit(f"  ... et {len(warnings) - 5} autres")
     
     # === STATISTIQUES ===
-    print("\nSTATISTIQUES DETAILLEES:")
-    print(f"  Entrees totales: {statistics['total_entries']}")
+    emit("\nSTATISTIQUES DETAILLEES:")
+    emit(f"  Entrees totales: {statistics['total_entries']}")
     
     if statistics['by_action']:
-        print("  Repartition par action:")
+        emit("  Repartition par action:")
         for action, count in sorted(statistics['by_action'].items()):
             percentage = (count / statistics['total_entries']) * 100
-            print(f"    - {action}: {count} ({percentage:.1f}%)")
+            emit(f"    - {action}: {count} ({percentage:.1f}%)")
     
     if statistics['by_agent']:
-        print("  Repartition par agent:")
-        for agent, count in sorted(
-            statistics['by_agent'].items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:5]:
+        emit("  Repartition par agent:")
+        # Top 5 via heapq.nlargest (meme ordre que sorted(..., reverse=True)[:5])
+        for agent, count in statistics['by_agent'].most_common(5):
             percentage = (count / statistics['total_entries']) * 100
-            print(f"    - {agent}: {count} ({percentage:.1f}%)")
+            emit(f"    - {agent}: {count} ({percentage:.1f}%)")
     
-    print("  Repartition par status:")
-    for status in ['SUCCESS', 'FAILURE']:
+    emit("  Repartition par status:")
+    for status in VALID_STATUSES_ORDERED:
         count = statistics['by_status'].get(status, 0)
         percentage = (count / statistics['total_entries']) * 100 \
                      if statistics['total_entries'] > 0 else 0
-        print(f"    - {status}: {count} ({percentage:.1f}%)")
+        emit(f"    - {status}: {count} ({percentage:.1f}%)")
     
     # === SCORE QUALITE ===
-    quality_score = calculate_quality_score(statistics, errors, warnings)
+    quality_score = _quality_score(
+        len(errors), len(warnings), total_entries,
+        len(statistics['by_agent']), statistics['max_iteration']
+    )
     statistics['quality_score'] = quality_score
     
-    print(f"\nSCORE DE QUALITE: {quality_score}/100")
+    emit(f"\nSCORE DE QUALITE: {quality_score}/100")
     if quality_score >= 90:
-        print("   [EXCELLENT] Pret pour soumission")
+        emit("   [EXCELLENT] Pret pour soumission")
     elif quality_score >= 70:
-        print("   [BON] Quelques ameliorations possibles")
+        emit("   [BON] Quelques ameliorations possibles")
     elif quality_score >= 50:
-        print("   [MOYEN] Corrections recommandees")
+        emit("   [MOYEN] Corrections recommandees")
     else:
-        print("   [FAIBLE] Corrections critiques necessaires")
+        emit("   [FAIBLE] Corrections critiques necessaires")
     
     # === VALIDATION FINALE ===
     is_ready_for_evaluation = len(errors) == 0 and quality_score >= 70
     
-    print("\n" + "=" * 80)
+    emit("\n" + "=" * 80)
     if is_ready_for_evaluation:
-        print("[SUCCESS] VALIDATION REUSSIE!")
-        print("   Les logs respectent TOUS les criteres du TP.")
-        print("   Pret pour l'evaluation automatisee.")
+        emit("[SUCCESS] VALIDATION REUSSIE!")
+        emit("   Les logs respectent TOUS les criteres du TP.")
+        emit("   Pret pour l'evaluation automatisee.")
     else:
         if errors:
-            print("[ERROR] VALIDATION ECHOUEE")
-            print("   Erreurs critiques detectees.")
+            emit("[ERROR] VALIDATION ECHOUEE")
+            emit("   Erreurs critiques detectees.")
         else:
-            print("[WARNING] VALIDATION PARTIELLE")
-            print("   Score < 70. Corriger les warnings.")
-        print("   -> Corriger les problemes avant la soumission.")
+            emit("[WARNING] VALIDATION PARTIELLE")
+            emit("   Score < 70. Corriger les warnings.")
+        emit("   -> Corriger les problemes avant la soumission.")
     
-    print("=" * 80)
+    emit("=" * 80)
     
-    # Convertir set en list pour serialisation
+    # Convertir set/Counter en types simples pour serialisation
     statistics["agents_detected"] = list(statistics["agents_detected"])
+    for key in ("by_agent", "by_action", "by_status"):
+        statistics[key] = dict(statistics[key])
     
     return is_ready_for_evaluation, errors, statistics
 
 
 def calculate_quality_score(statistics: Dict, errors: List[str], warnings: List[str]) -> int:
-    """Calcule un score de qualite sur 100."""
+    """Calcule un score de qualite sur 100 (enveloppe de _quality_score)."""
+    return _quality_score(
+        len(errors), len(warnings),
+        statistics.get('total_entries', 0),
+        len(statistics.get('by_agent', {})),
+        statistics.get('max_iteration', 0)
+    )
+
+
+def _quality_score(error_count: int, warning_count: int, total_entries: int,
+                   agent_count: int, max_iteration: int) -> int:
+    """Score sur 100 a partir des compteurs deja connus en fin de boucle."""
     score = 100
     
-    score -= len(errors) * 15
-    score -= len(warnings) * 2
-    
-    total_entries = statistics.get('total_entries', 0)
+    score -= error_count * 15
+    score -= warning_count * 2
     
     if total_entries >= 100:
         score += 15
@@ -431,13 +779,11 @@ def calculate_quality_score(statistics: Dict, errors: List[str], warnings: List[
     elif total_entries >= 20:
         score += 5
     
-    agents = statistics.get('by_agent', {})
-    if len(agents) >= 5:
+    if agent_count >= 5:
         score += 10
-    elif len(agents) >= 3:
+    elif agent_count >= 3:
         score += 5
     
-    max_iteration = statistics.get('max_iteration', 0)
     if max_iteration > 0 and max_iteration <= 10:
         score += 10
     elif max_iteration > 10:
@@ -3,12 +3,14 @@ This file will be called by the correction bot with: python main.py --target_dir
 """
 
 import argparse
+import logging
 import sys
 import os
 import json
 from pathlib import Path
 from dotenv import load_dotenv
 from src.workflow.orchestrator import RefactoringOrchestrator
+from src.utils.logger import flush_logs
 
 # Load environment variables
 load_dotenv()
@@ -27,29 +29,33 @@ def validate_environment():
 def clean_logs():
     """Clean the experiment logs file."""
     log_file = Path("logs/experiment_data.json")
-    if log_file.exists():
-        # Create a backup before cleaning
-        backup_file = Path(f"logs/experiment_data_backup_{os.getpid()}.json")
-        try:
-            with open(log_file, 'r') as f:
-                existing_data = f.read()
-                if existing_data.strip():
-                    with open(backup_file, 'w') as backup:
-                        backup.write(existing_data)
-                    print(f"Backup created: {backup_file}")
-        except:
-            pass
-        
-        # Create empty logs array
-        with open(log_file, 'w') as f:
-            json.dump([], f, indent=4)
-        print("Logs cleaned successfully")
-    else:
+    try:
+        # Stops at the first chunk with non-whitespace content
+        with open(log_file, 'rb') as f:
+            has_data = any(chunk.strip() for chunk in iter(lambda: f.read(1 << 16), b''))
+    except FileNotFoundError:
         # Create empty logs file if it doesn't exist
         log_file.parent.mkdir(exist_ok=True)
         with open(log_file, 'w') as f:
             json.dump([], f, indent=4)
         print("Empty logs file created")
+        return
+    
+    # Create a backup before cleaning (rename, no copy of the data)
+    backup_file = Path(f"logs/experiment_data_backup_{os.getpid()}.json")
+    if has_data:
+        try:
+            os.replace(log_file, backup_file)
+        except OSError as e:
+            # Keep the current logs rather than truncating them without a backup
+            print(f"WARNING: could not back up logs, cleaning skipped: {e}")
+            return
+        print(f"Backup created: {backup_file}")
+    
+    # Create empty logs array
+    with open(log_file, 'w') as f:
+        json.dump([], f, indent=4)
+    print("Logs cleaned successfully")
 
 
 def print_banner():
@@ -87,9 +93,21 @@ def main():
         action="store_true",
         help="Clean the experiment logs before starting"
     )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Hide per-agent and per-tool progress messages"
+    )
     
     args = parser.parse_args()
     
+    # Agent and tool progress messages go through logging; shown like prints by default
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout
+    )
+    
     # Clean logs if requested
     if args.clean_logs:
         clean_logs()
@@ -148,6 +166,13 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    
+    finally:
+        # Write log entries still queued (e.g. after an interruption)
+        try:
+            flush_logs()
+        except Exception as e:
+            print(f"ERROR: Could not write logs/experiment_data.json: {e}")
 
 
 if __name__ == "__main__":
@@ -1,3 +1,15 @@
-"""The Refactoring Swarm - Multi-Agent Code Refactoring System"""
+"""The Refactoring Swarm - Multi-Agent Code Refactoring System
 
-__version__ = "1.0.0"
\ No newline at end of file
+Agents, tools and the LLM client report progress through the "agents",
+"tools" and "llm" loggers. The package only attaches NullHandlers to them:
+callers must configure logging (main.py calls logging.basicConfig) to see
+these messages.
+"""
+
+import logging
+
+__version__ = "1.0.0"
+
+for _name in ("agents", "tools", "llm"):
+    logging.getLogger(_name).addHandler(logging.NullHandler())
+del _name
@@ -3,39 +3,57 @@ Auditor Agent
 Reads code, runs static analysis, and produces a refactoring plan.
 """
 
+import asyncio
+import hashlib
 import json
+import os
 import re
-from typing import Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
 from .base_agent import BaseAgent
-from src.llm.client import LLMClient
+from src.llm.client import LLMClient, JSON_INSTRUCTION
 from src.tools.analysis_tools import AnalysisTools
+from src.utils.jsonio import loads as _json_loads, dumps_bytes as _json_dumps_bytes
 from src.utils.logger import log_experiment, ActionType
 
 
-class AuditorAgent(BaseAgent):
-    """
-    The Auditor analyzes code and creates a structured refactoring plan.
-    """
-    
-    def __init__(self):
-        super().__init__("AuditorAgent")
-        self.llm_client = LLMClient()
-        self.analysis_tools = AnalysisTools()
-        self._load_prompt_template()
-    
-    def _load_prompt_template(self):
-        """Load the auditor prompt from file."""
-        try:
-            with open("src/prompts/auditor_prompt.txt", 'r', encoding='utf-8') as f:
-                self.prompt_template = f.read()
-            self._log("Prompt template loaded")
-        except FileNotFoundError:
-            self._log("Prompt template not found, using default")
-            self.prompt_template = self._get_default_prompt()
-    
-    def _get_default_prompt(self) -> str:
-        """Get default prompt template."""
-        return """You are a Senior Python Code Auditor with expertise in code quality and best practices.
+_ISSUE_KEYS = ("critical_issues", "major_issues", "minor_issues")
+# Age after which a cached audit verdict is ignored and removed
+_CACHE_TTL = 7 * 86400
+
+# Pylint message type -> plan bucket; anything else is a minor issue
+_PYLINT_SEVERITY = {
+    "fatal": "critical_issues",
+    "error": "critical_issues",
+    "warning": "major_issues",
+}
+
+# Delta re-audit: minimum Jaccard overlap of code blocks with the previous audit
+_DELTA_MIN_OVERLAP = 0.8
+
+# Stands in for {code} in the system prompt; the code itself is the user prompt
+_CODE_REFERENCE = "(the code is provided in the user message)"
+
+# Rough token estimate for Gemini prompts (no local tokenizer needed)
+_CHARS_PER_TOKEN = 4
+
+# Prompts beyond 80% of the model context (1M tokens) are not sent at all
+_MAX_PROMPT_TOKENS = 800_000
+
+# Batch audits: larger prompts are sent on their own so answers fit the output limit
+_BATCH_MAX_PROMPT_TOKENS = 5000
+
+_BATCH_INSTRUCTION = """
+Audit each of the {count} files above independently. Return ONLY a valid JSON
+object of the form {{"results": [{{"file": "<file path as given>", "critical_issues": [...],
+"major_issues": [...], "minor_issues": [...], "summary": {{...}}}}]}} with one
+entry per file, using the same issue format as a single-file audit."""
+
+# Fallback template when auditor_prompt.txt cannot be found
+_DEFAULT_PROMPT = """You are a Senior Python Code Auditor with expertise in code quality and best practices.
 
 TASK: Analyze the provided Python code and create a detailed refactoring plan.
 
@@ -87,6 +105,167 @@ You MUST return ONLY a valid JSON object with this exact structure:
 }}
 
 CRITICAL: Return ONLY the JSON object. No markdown, no explanations, no code blocks."""
+
+_DELTA_PROMPT = """You are re-auditing a Python file after an edit.
+Lines 1-{last_unchanged} are unchanged since the previous audit, whose summary was:
+{previous_summary}
+
+Only analyze the changed code below, which starts at line {start_line}.
+Report line numbers relative to the whole file.
+
+CHANGED CODE:
+```python
+{code}
+```
+
+Return ONLY a valid JSON object with the keys "critical_issues", "major_issues",
+"minor_issues" and "summary", using the same issue format as a full audit."""
+
+
+# Characters the JSON object scanner stops at, outside and inside strings
+_STRUCTURAL_RE = re.compile(r'[{}"]')
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+
+
+def _estimate_tokens(text: str) -> int:
+    """Approximate token count of text (about 4 characters per token)."""
+    return len(text) // _CHARS_PER_TOKEN
+
+
+class _JsonObjectScanner:
+    """
+    Incremental matcher for the first balanced {...} in a stream of chunks.
+    Braces inside JSON strings (including escaped quotes) are ignored.
+    """
+    
+    def __init__(self):
+        self.start = -1
+        self.end = -1
+        self._offset = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+    
+    def feed(self, chunk: str) -> bool:
+        """
+        Scan the next chunk.
+        
+        Args:
+            chunk: Next piece of text
+        
+        Returns:
+            True once the object is complete (start/end are offsets in the
+            concatenated text)
+        """
+        if self.end != -1:
+            return True
+        
+        i = 0
+        if self.start == -1:
+            i = chunk.find("{")
+            if i == -1:
+                self._offset += len(chunk)
+                return False
+            self.start = self._offset + i
+        
+        # Jump between structural characters instead of stepping through
+        # every character of the (mostly string) content
+        n = len(chunk)
+        pos = i
+        if self._escaped:
+            # A backslash ended the previous chunk: skip the escaped character
+            if pos < n:
+                pos += 1
+                self._escaped = False
+        while pos < n:
+            if self._in_string:
+                match = _STRING_SPECIAL_RE.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match.group() == '"':
+                    self._in_string = False
+                elif pos < n:
+                    pos += 1
+                else:
+                    self._escaped = True
+            else:
+                match = _STRUCTURAL_RE.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                char = match.group()
+                if char == '"':
+                    self._in_string = True
+                elif char == "{":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self.end = self._offset + pos
+                        return True
+        
+        self._offset += n
+        return False
+
+
+class AuditorAgent(BaseAgent):
+    """
+    The Auditor analyzes code and creates a structured refactoring plan.
+    """
+    
+    # Prompt template locations, tried in order (repo root, then src/)
+    _PROMPT_PATHS = ("src/prompts/auditor_prompt.txt", "prompts/auditor_prompt.txt")
+    
+    # Prompt template path -> (mtime, text); re-read only when the file changes
+    _PROMPT_CACHE: Dict[str, Tuple[float, str]] = {}
+    
+    def __init__(self):
+        super().__init__("AuditorAgent")
+        self.llm_client = LLMClient.shared()
+        self.analysis_tools = AnalysisTools()
+        # Audit verdicts of this process, keyed like the disk cache
+        self._verdicts: Dict[str, bytes] = {}
+        # Verdicts kept across runs unless HIVEMIND_DISK_CACHE=0
+        self.cache_dir = Path(".cache") / "auditor"
+        self.disk_cache = os.getenv("HIVEMIND_DISK_CACHE", "1") != "0"
+        # current_file -> (code block hashes, plan) of the last LLM audit
+        self._previous_audits: Dict[str, Tuple[List[str], Dict[str, Any]]] = {}
+        self._load_prompt_template()
+    
+    def _load_prompt_template(self):
+        """Load the auditor prompt from file (shared by all instances until edited)."""
+        cache = type(self)._PROMPT_CACHE
+        for path in self._PROMPT_PATHS:
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            cached = cache.get(path)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, Path(path).read_text(encoding='utf-8'))
+                cache[path] = cached
+                self._log(f"Prompt template loaded from {path}")
+            self.prompt_template = cached[1]
+            break
+        else:
+            self._log("Prompt template not found, using default")
+            self.prompt_template = self._get_default_prompt()
+        # Verdicts depend on the model and template: hash them once, then
+        # copy the digest per file in _cache_key
+        self._cache_digest = hashlib.sha256(self.llm_client.model_name.encode('utf-8'))
+        self._cache_digest.update(b"\0")
+        self._cache_digest.update(self.prompt_template.encode('utf-8'))
+        self._cache_digest.update(b"\0")
+        
+        # Static instructions go in the system prompt, built once, so every
+        # file's request shares the same cacheable prefix
+        json_tail = "" if "json" in self.prompt_template.lower() else JSON_INSTRUCTION
+        self._system_prompt = self.prompt_template.replace("{code}", _CODE_REFERENCE) + json_tail
+    
+    def _get_default_prompt(self) -> str:
+        """Get default prompt template."""
+        return _DEFAULT_PROMPT
     
     def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -98,30 +277,193 @@ CRITICAL: Return ONLY the JSON object. No markdown, no explanations, no code blo
         Returns:
             State updates with audit report
         """
+        result, job = self._prepare_audit(state)
+        if result is not None:
+            return result
+        
+        return self._audit_job(state, job)
+    
+    def execute_batch(self, states: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Audit several files, sending those that fit together in one LLM call.
+        
+        Files the model leaves out of the batch answer, delta re-audits and
+        large files are audited on their own.
+        
+        Args:
+            states: Workflow states, one per file
+        
+        Returns:
+            State updates with audit report, in the order of states
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(states)
+        batch = []
+        for i, state in enumerate(states):
+            result, job = self._prepare_audit(state)
+            if result is not None:
+                results[i] = result
+            elif job["delta"] is None and _estimate_tokens(job["prompt"]) <= _BATCH_MAX_PROMPT_TOKENS:
+                batch.append((i, state, job))
+            else:
+                results[i] = self._audit_job(state, job)
+        
+        if len(batch) == 1:
+            i, state, job = batch[0]
+            results[i] = self._audit_job(state, job)
+        elif batch:
+            prompt = self._render_batch_prompt([job for _, _, job in batch])
+            self._log(f"Calling LLM for {len(batch)} files in one request...")
+            try:
+                llm_response = self._call_llm_streaming(prompt, self._system_prompt)
+                plans = self._parse_batch(llm_response)
+            except Exception as e:
+                self._log(f"Batch audit failed, auditing files one by one: {e}")
+                plans = {}
+            
+            for i, state, job in batch:
+                plan = plans.get(job["current_file"])
+                if plan is None:
+                    results[i] = self._audit_job(state, job)
+                else:
+                    job = dict(job, system=self._system_prompt, prompt=prompt)
+                    results[i] = self._finish_audit(state, job, llm_response, plan)
+        
+        return results
+    
+    def execute_many(self, states: List[Dict[str, Any]], max_workers: int = 4,
+                     batch_size: int = 1) -> List[Dict[str, Any]]:
+        """
+        Audit several files on a thread pool; the threads spend their time
+        waiting on the LLM, so the calls overlap.
+        
+        Args:
+            states: Workflow states, one per file
+            max_workers: Maximum LLM requests in flight at once
+            batch_size: Files per request (see execute_batch)
+        
+        Returns:
+            State updates with audit report, in the order of states
+        """
+        size = max(1, batch_size)
+        groups = [states[i:i + size] for i in range(0, len(states), size)]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return [result for results in pool.map(self.execute_batch, groups)
+                    for result in results]
+    
+    def prefetch_pylint(self, states: List[Dict[str, Any]]):
+        """
+        Run pylint once over every file the verdict cache cannot answer, so
+        the audits that follow reuse its results instead of each starting
+        their own pylint process.
+        
+        Args:
+            states: Workflow states, one per file
+        """
+        paths = [
+            state["current_file"] for state in states
+            if state.get("file_content")
+            and self._load_cached_audit(self._cache_key(state["file_content"])) is None
+        ]
+        if len(paths) > 1:
+            self._log(f"Running pylint once over {len(paths)} files...")
+            self.analysis_tools.run_pylint_many(paths)
+    
+    def _audit_job(self, state: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the LLM call for one prepared audit and finish it.
+        
+        Args:
+            state: Current workflow state
+            job: Second item returned by _prepare_audit
+        
+        Returns:
+            State updates with audit report
+        """
+        # Step 5: Call LLM for detailed analysis
+        self._log("Calling LLM for detailed analysis...")
+        try:
+            llm_response = self._call_llm_streaming(job["prompt"], job["system"])
+        except Exception as e:
+            self._log(f"LLM call failed: {e}")
+            return self._create_error_result(state, f"LLM error: {e}")
+        
+        return self._finish_audit(state, job, llm_response)
+    
+    async def execute_async(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Asynchronous execute(): the LLM call is awaited so several audits can
+        be in flight at once; pylint runs in the default thread pool.
+        
+        Args:
+            state: Current workflow state
+        
+        Returns:
+            State updates with audit report
+        """
+        loop = asyncio.get_running_loop()
+        result, job = await loop.run_in_executor(None, self._prepare_audit, state)
+        if result is not None:
+            return result
+        
+        self._log("Calling LLM for detailed analysis...")
+        try:
+            llm_response = await self._call_llm_streaming_async(job["prompt"], job["system"])
+        except Exception as e:
+            self._log(f"LLM call failed: {e}")
+            return self._create_error_result(state, f"LLM error: {e}")
+        
+        return self._finish_audit(state, job, llm_response)
+    
+    def _prepare_audit(self, state: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Everything before the LLM call: cache lookup, static analysis, prompt.
+        
+        Args:
+            state: Current workflow state
+        
+        Returns:
+            (state updates, {}) when the audit is already settled (error or
+            cache hit), otherwise (None, job) where job feeds _finish_audit
+        """
         current_file = state.get('current_file', 'unknown')
         self._log(f"Analyzing: {current_file}")
         
         # Get code from state
         code = state.get("file_content", "")
         if not code:
-            return self._create_error_result(state, "No code content to analyze")
+            return self._create_error_result(state, "No code content to analyze"), {}
+        
+        # Step 0: Reuse a previous verdict for identical code and prompt
+        cache_key = self._cache_key(code)
+        cached = self._load_cached_audit(cache_key)
+        if cached is not None:
+            self._log("Cache hit, skipping pylint and LLM analysis")
+            self._previous_audits[current_file] = (self._block_hashes(code), cached["plan"])
+            return {
+                "audit_report": cached["plan"],
+                "agent_outputs": {
+                    "audit_report": cached["plan"],
+                    "original_pylint_score": cached["pylint_score"]
+                }
+            }, {}
         
         # Step 1: Run static analysis (pylint)
         self._log("Running pylint analysis...")
         pylint_result = self.analysis_tools.run_pylint(current_file)
         
         # Step 2: Check syntax
-        syntax_check = self.analysis_tools.check_syntax(code)
+        tree, syntax_check = self.analysis_tools.parse_code(code)
         
         # Step 3: Get code metrics
-        function_count = self.analysis_tools.count_functions(code)
-        class_count = self.analysis_tools.count_classes(code)
-        complexity = self.analysis_tools.get_complexity_estimate(code)
-        
-        # Step 4: Prepare prompt for LLM
-        prompt = self.prompt_template.replace("{code}", code)
+        counts = self.analysis_tools.count_definitions(code, tree)
+        function_count = counts["functions"]
+        class_count = counts["classes"]
+        complexity = self.analysis_tools.get_complexity_estimate(
+            code, function_count, class_count
+        )
         
-        # Add context from static analysis
+        # Step 4: Prepare prompt for LLM; the template is the system prompt and
+        # only per-file context and code go in the user prompt
         context = f"""
 STATIC ANALYSIS RESULTS:
 - Pylint score: {pylint_result.get('score', 'N/A')}/10
@@ -130,18 +472,77 @@ STATIC ANALYSIS RESULTS:
 - Classes: {class_count}
 - Complexity: {complexity}
 """
-        prompt = context + "\n" + prompt
+        # Only the edited tail goes to the LLM when the rest matches the last audit
+        block_hashes = self._block_hashes(code)
+        delta = self._delta_audit(current_file, code, block_hashes)
+        # The system prompt defines the issue format, so deltas send it too
+        system = self._system_prompt
+        if delta is not None:
+            prompt = delta[0] + "\n" + context
+        else:
+            prompt = self._render_user_prompt(context, code)
         
-        # Step 5: Call LLM for detailed analysis
-        self._log("Calling LLM for detailed analysis...")
-        try:
-            llm_response = self.llm_client.call_with_json(prompt)
-        except Exception as e:
-            self._log(f"LLM call failed: {e}")
-            return self._create_error_result(state, f"LLM error: {e}")
+        if _estimate_tokens(prompt) > _MAX_PROMPT_TOKENS:
+            # The request would be rejected: audit from pylint alone
+            self._log("File too large for the model context, using static analysis only")
+            plan = self._create_fallback_plan(pylint_result)
+            return {
+                "audit_report": plan,
+                "agent_outputs": {
+                    "audit_report": plan,
+                    "original_pylint_score": pylint_result.get('score', 0.0)
+                }
+            }, {}
         
-        # Step 6: Parse LLM response
-        refactoring_plan = self._parse_response(llm_response, pylint_result)
+        return None, {
+            "current_file": current_file,
+            "cache_key": cache_key,
+            "pylint_result": pylint_result,
+            "block_hashes": block_hashes,
+            "delta": delta,
+            "system": system,
+            "prompt": prompt,
+        }
+    
+    def _finish_audit(self, state: Dict[str, Any], job: Dict[str, Any],
+                      llm_response: str,
+                      plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Everything after the LLM call: parse, cache, log, build state updates.
+        
+        Args:
+            state: Current workflow state
+            job: Second item returned by _prepare_audit
+            llm_response: Raw LLM response
+            plan: This file's plan, already decoded from a batch response
+        
+        Returns:
+            State updates with audit report
+        """
+        current_file = job["current_file"]
+        pylint_result = job["pylint_result"]
+        delta = job["delta"]
+        
+        # Step 6: Parse LLM response (only real LLM verdicts are cached)
+        try:
+            refactoring_plan = self._parse_plan(llm_response if plan is None else plan)
+        except (json.JSONDecodeError, ValueError) as e:
+            self._log(f"Failed to parse LLM response: {e}")
+            if os.environ.get("AUDITOR_DEBUG"):
+                self._dump_response(current_file, llm_response)
+            
+            # Fallback: Create plan from pylint results
+            refactoring_plan = self._create_fallback_plan(pylint_result)
+        else:
+            if delta is not None:
+                _, tail_start_line, previous_plan = delta
+                refactoring_plan = self._merge_delta_plan(
+                    previous_plan, refactoring_plan, tail_start_line
+                )
+            self._previous_audits[current_file] = (job["block_hashes"], refactoring_plan)
+            self._save_cached_audit(
+                job["cache_key"], refactoring_plan, pylint_result.get('score', 0.0)
+            )
         
         # Step 7: Log the experiment
         log_experiment(
@@ -150,8 +551,9 @@ STATIC ANALYSIS RESULTS:
             action=ActionType.ANALYSIS,
             details={
                 "file_analyzed": current_file,
-                "input_prompt": prompt,
-                "output_response": llm_response,
+                # The system prompt is the same static template for every file
+                "input_prompt": self._truncate(job["prompt"]),
+                "output_response": self._truncate(llm_response),
                 "pylint_score": pylint_result.get('score', 0.0),
                 "issues_found": refactoring_plan.get('summary', {}).get('total_issues', 0)
             },
@@ -162,61 +564,387 @@ STATIC ANALYSIS RESULTS:
         return {
             "audit_report": refactoring_plan,
             "agent_outputs": {
-                **(state.get("agent_outputs") or {}),
                 "audit_report": refactoring_plan,
                 "original_pylint_score": pylint_result.get('score', 0.0)
             }
         }
     
-    def _parse_response(self, response: str, pylint_result: Dict) -> Dict[str, Any]:
+    def _render_user_prompt(self, context: str, code: str) -> str:
+        """
+        Build the per-file user prompt that follows the cached system prompt.
+        
+        Args:
+            context: Static analysis summary
+            code: Code to audit, placed last
+        
+        Returns:
+            The user prompt
+        """
+        return "".join((context, "\nCODE TO ANALYZE:\n```python\n", code, "\n```\n"))
+    
+    def _call_llm_streaming(self, prompt: str, system: Optional[str] = None) -> str:
+        """
+        Stream the LLM response, stopping once the top-level JSON object closes.
+        
+        Args:
+            prompt: The prompt to send
+            system: System prompt (optional)
+        
+        Returns:
+            The response text received so far
+        """
+        scanner = _JsonObjectScanner()
+        chunks = []
+        stream = self.llm_client.call_stream(prompt, temperature=0.0, system=system)
+        try:
+            for chunk in stream:
+                chunks.append(chunk)
+                if scanner.feed(chunk):
+                    # The client only caches fully read streams
+                    self.llm_client.remember(prompt, "".join(chunks), temperature=0.0, system=system)
+                    break
+        finally:
+            # Stop reading the HTTP stream now rather than when it is collected
+            stream.close()
+        
+        if not chunks:
+            raise ValueError("Empty response from LLM")
+        
+        return "".join(chunks)
+    
+    async def _call_llm_streaming_async(self, prompt: str,
+                                        system: Optional[str] = None) -> str:
+        """
+        Async counterpart of _call_llm_streaming.
+        
+        Args:
+            prompt: The prompt to send
+            system: System prompt (optional)
+        
+        Returns:
+            The response text received so far
+        """
+        scanner = _JsonObjectScanner()
+        chunks = []
+        stream = self.llm_client.call_stream_async(prompt, temperature=0.0, system=system)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                if scanner.feed(chunk):
+                    # The client only caches fully read streams
+                    self.llm_client.remember(prompt, "".join(chunks), temperature=0.0, system=system)
+                    break
+        finally:
+            # Release the HTTP stream now rather than at loop shutdown
+            await stream.aclose()
+        
+        if not chunks:
+            raise ValueError("Empty response from LLM")
+        
+        return "".join(chunks)
+    
+    def _parse_plan(self, response: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
         """
         Parse the LLM response into a structured refactoring plan.
         
         Args:
-            response: Raw LLM response
-            pylint_result: Results from pylint
+            response: Raw LLM response, or an already decoded plan dict
+                (validated in place, no JSON round-trip)
         
         Returns:
             Structured refactoring plan
+        
+        Raises:
+            ValueError: If no JSON object can be parsed from the response
+        """
+        plan = response if isinstance(response, dict) else self._decode_json(response)
+        
+        # Validate structure
+        if not isinstance(plan, dict):
+            raise ValueError("Response is not a JSON object")
+        
+        # Ensure required keys exist and count issues in the same pass;
+        # summary.total_issues is the single count read downstream
+        total = 0
+        for key in _ISSUE_KEYS:
+            total += len(plan.setdefault(key, []))
+        plan.setdefault("summary", {})["total_issues"] = total
+        
+        self._log(f"Found {total} issues to address")
+        
+        return plan
+    
+    def _decode_json(self, response: str) -> Any:
+        """
+        Decode the JSON value in an LLM response, ignoring fences and prose.
+        
+        Args:
+            response: Raw LLM response
+        
+        Returns:
+            The decoded value
+        
+        Raises:
+            ValueError: If no JSON can be parsed from the response
+        """
+        cleaned = response.strip()
+        if cleaned.startswith("```"):
+            # Drop the opening fence line; the scan stops before the closing one
+            cleaned = cleaned.partition("\n")[2].lstrip()
+        
+        if cleaned.startswith("["):
+            return _json_loads(cleaned)
+        
+        if cleaned.startswith("{"):
+            try:
+                # Bare JSON object: parsed directly, no scan needed
+                return _json_loads(cleaned)
+            except json.JSONDecodeError:
+                pass
+        
+        # Prose or trailing text around the object: one linear scan
+        # locates the first balanced {...}
+        return _json_loads(self._extract_json_object(cleaned))
+    
+    def _render_batch_prompt(self, jobs: List[Dict[str, Any]]) -> str:
+        """
+        Build one user prompt covering several files.
+        
+        Args:
+            jobs: Prepared full-audit jobs
+        
+        Returns:
+            The numbered per-file prompts followed by the batch instruction
         """
-        # Try to extract JSON from response
+        pieces = []
+        for number, job in enumerate(jobs, 1):
+            pieces.append(f"## FILE {number}: {job['current_file']}\n")
+            pieces.append(job["prompt"])
+            pieces.append("\n")
+        pieces.append(_BATCH_INSTRUCTION.format(count=len(jobs)))
+        return "".join(pieces)
+    
+    def _parse_batch(self, response: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Split a batch response into per-file plans.
+        
+        Args:
+            response: Raw LLM response to a batch prompt
+        
+        Returns:
+            File name -> plan, for every well-formed entry
+        
+        Raises:
+            ValueError: If the response has no "results" list
+        """
+        decoded = self._decode_json(response)
+        entries = decoded.get("results") if isinstance(decoded, dict) else None
+        if not isinstance(entries, list):
+            raise ValueError('Batch response has no "results" list')
+        
+        plans = {}
+        for entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get("file"), str):
+                plan = dict(entry)
+                plans[plan.pop("file")] = plan
+        return plans
+    
+    def _dump_response(self, current_file: str, response: str):
+        """
+        Save an unparseable LLM response for debugging (AUDITOR_DEBUG only).
+        
+        Args:
+            current_file: Path of the audited file
+            response: Raw LLM response
+        """
+        debug_file = Path(f"auditor_response_{Path(current_file).stem}.txt")
         try:
-            # Remove markdown code blocks if present
-            cleaned = response.strip()
-            if cleaned.startswith("```"):
-                # Extract content between code fences
-                match = re.search(r'```(?:json)?\s*\n(.*?)\n```', cleaned, re.DOTALL)
-                if match:
-                    cleaned = match.group(1)
-            
-            # Parse JSON
-            plan = json.loads(cleaned)
-            
-            # Validate structure
-            if not isinstance(plan, dict):
-                raise ValueError("Response is not a JSON object")
-            
-            # Ensure required keys exist
-            plan.setdefault("critical_issues", [])
-            plan.setdefault("major_issues", [])
-            plan.setdefault("minor_issues", [])
-            plan.setdefault("summary", {})
-            
-            # Add total issues count
-            total = (len(plan["critical_issues"]) + 
-                    len(plan["major_issues"]) + 
-                    len(plan["minor_issues"]))
-            plan["summary"]["total_issues"] = total
-            
-            self._log(f"Found {total} issues to address")
-            
-            return plan
+            debug_file.write_text(response, encoding='utf-8')
+            self._log(f"Raw response saved to {debug_file}")
+        except OSError as e:
+            self._log(f"Could not save raw response: {e}")
+    
+    def _block_hashes(self, code: str) -> List[str]:
+        """
+        Hash each blank-line separated block of code.
         
-        except (json.JSONDecodeError, ValueError) as e:
-            self._log(f"Failed to parse LLM response: {e}")
-            
-            # Fallback: Create plan from pylint results
-            return self._create_fallback_plan(pylint_result)
+        Args:
+            code: Code being audited
+        
+        Returns:
+            SHA-256 hex digests, in file order
+        """
+        return [
+            hashlib.sha256(block.encode('utf-8', 'surrogatepass')).hexdigest()
+            for block in code.split("\n\n")
+        ]
+    
+    def _delta_audit(self, current_file: str, code: str,
+                     block_hashes: List[str]) -> Optional[Tuple[str, int, Dict[str, Any]]]:
+        """
+        Build a prompt covering only the changed tail of a re-audited file.
+        
+        Applies when the blocks overlap the previous audit by at least
+        _DELTA_MIN_OVERLAP (Jaccard) and every changed block follows the
+        unchanged prefix.
+        
+        Args:
+            current_file: Path of the audited file
+            code: Current code
+            block_hashes: Result of _block_hashes(code)
+        
+        Returns:
+            (prompt, first line of the tail, previous plan), or None for a full audit
+        """
+        previous = self._previous_audits.get(current_file)
+        if previous is None:
+            return None
+        previous_hashes, previous_plan = previous
+        
+        unchanged = 0
+        for old_hash, new_hash in zip(previous_hashes, block_hashes):
+            if old_hash != new_hash:
+                break
+            unchanged += 1
+        if unchanged == 0 or unchanged == len(block_hashes):
+            return None
+        
+        old_set, new_set = set(previous_hashes), set(block_hashes)
+        if len(old_set & new_set) / len(old_set | new_set) < _DELTA_MIN_OVERLAP:
+            return None
+        
+        blocks = code.split("\n\n")
+        prefix = "\n\n".join(blocks[:unchanged])
+        tail_start_line = prefix.count("\n") + 3
+        prompt = _DELTA_PROMPT.format(
+            last_unchanged=tail_start_line - 1,
+            previous_summary=json.dumps(previous_plan.get("summary", {})),
+            start_line=tail_start_line,
+            code="\n\n".join(blocks[unchanged:])
+        )
+        self._log(f"Delta audit from line {tail_start_line}")
+        return prompt, tail_start_line, previous_plan
+    
+    def _merge_delta_plan(self, previous_plan: Dict[str, Any], delta_plan: Dict[str, Any],
+                          tail_start_line: int) -> Dict[str, Any]:
+        """
+        Combine previous issues in the unchanged prefix with the delta audit.
+        
+        Args:
+            previous_plan: Plan from the previous audit
+            delta_plan: Plan for the changed tail
+            tail_start_line: First line of the changed tail
+        
+        Returns:
+            Plan covering the whole file
+        """
+        for key in _ISSUE_KEYS:
+            kept = [
+                issue for issue in previous_plan.get(key, [])
+                if isinstance(issue, dict)
+                and isinstance(issue.get("line"), int)
+                and issue["line"] < tail_start_line
+            ]
+            delta_plan[key] = kept + delta_plan[key]
+        
+        delta_plan["summary"]["total_issues"] = sum(
+            len(delta_plan[key]) for key in _ISSUE_KEYS
+        )
+        return delta_plan
+    
+    def _cache_key(self, code: str) -> str:
+        """
+        Hash the model name, prompt template and code into an audit cache key.
+        
+        Args:
+            code: Code being audited
+        
+        Returns:
+            SHA-256 hex digest
+        """
+        digest = self._cache_digest.copy()
+        digest.update(code.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+    
+    def _load_cached_audit(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a cached audit verdict.
+        
+        Args:
+            cache_key: Key from _cache_key
+        
+        Returns:
+            Dict with 'plan' and 'pylint_score', or None on a cache miss
+        """
+        payload = self._verdicts.get(cache_key)
+        if payload is None:
+            if not self.disk_cache:
+                return None
+            cache_file = self.cache_dir / f"{cache_key}.json"
+            try:
+                if time.time() - cache_file.stat().st_mtime > _CACHE_TTL:
+                    cache_file.unlink()
+                    return None
+                with open(cache_file, 'rb') as f:
+                    payload = f.read()
+            except OSError:
+                return None
+        try:
+            cached = _json_loads(payload)
+        except ValueError:
+            return None
+        
+        if not isinstance(cached, dict) or not isinstance(cached.get("plan"), dict):
+            return None
+        try:
+            cached["plan"] = self._parse_plan(cached["plan"])
+        except (TypeError, ValueError):
+            return None
+        cached.setdefault("pylint_score", 0.0)
+        return cached
+    
+    def _save_cached_audit(self, cache_key: str, plan: Dict[str, Any], pylint_score: float):
+        """
+        Store an audit verdict; a failed write only disables caching.
+        
+        Args:
+            cache_key: Key from _cache_key
+            plan: Validated refactoring plan
+            pylint_score: Pylint score of the audited file
+        """
+        try:
+            payload = _json_dumps_bytes({"plan": plan, "pylint_score": pylint_score})
+        except (TypeError, ValueError) as e:
+            self._log(f"Could not write audit cache: {e}")
+            return
+        self._verdicts[cache_key] = payload
+        if not self.disk_cache:
+            return
+        
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_file, cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            self._log(f"Could not write audit cache: {e}")
+    
+    def _extract_json_object(self, text: str) -> str:
+        """
+        Locate the first balanced JSON object in text with a linear scan.
+        
+        Args:
+            text: Text that may contain a JSON object
+        
+        Returns:
+            The object substring, or text unchanged if none is found
+        """
+        scanner = _JsonObjectScanner()
+        if scanner.feed(text):
+            return text[scanner.start:scanner.end]
+        return text
     
     def _create_fallback_plan(self, pylint_result: Dict) -> Dict[str, Any]:
         """
@@ -242,21 +970,14 @@ STATIC ANALYSIS RESULTS:
             }
         }
         
-        # Categorize pylint issues
+        # Categorize pylint issues by severity (one dict lookup per issue)
         for issue in issues:
-            issue_dict = {
+            issue_type = issue.get('type')
+            plan[_PYLINT_SEVERITY.get(issue_type, "minor_issues")].append({
                 "line": issue.get('line', 0),
-                "type": issue.get('type', 'unknown'),
+                "type": issue_type if 'type' in issue else 'unknown',
                 "description": issue.get('message', 'Unknown issue'),
                 "suggestion": f"Fix {issue.get('message-id', 'issue')}"
-            }
-            
-            # Categorize by severity
-            if issue.get('type') in ['error', 'fatal']:
-                plan["critical_issues"].append(issue_dict)
-            elif issue.get('type') == 'warning':
-                plan["major_issues"].append(issue_dict)
-            else:
-                plan["minor_issues"].append(issue_dict)
+            })
         
         return plan
\ No newline at end of file
@@ -3,9 +3,13 @@ Base Agent Class
 All agents (Auditor, Fixer, Judge) inherit from this class.
 """
 
+import logging
 from abc import ABC, abstractmethod
 from typing import Dict, Any
 
+# Agent progress messages; main.py shows them at INFO level
+logger = logging.getLogger("agents")
+
 
 class BaseAgent(ABC):
     """
@@ -21,7 +25,7 @@ class BaseAgent(ABC):
             name: Name of the agent (e.g., "AuditorAgent")
         """
         self.name = name
-        print(f"[CREATED] {name} created")
+        logger.info("[CREATED] %s created", name)
     
     @abstractmethod
     def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -50,21 +54,31 @@ class BaseAgent(ABC):
             State updates with error information
         """
         return {
-            "agent_outputs": {
-                **(state.get("agent_outputs") or {}),
-                f"{self.name}_error": error
-            },
+            "agent_outputs": {f"{self.name}_error": error},
             "errors": [
                 *(state.get("errors") or []),
                 f"{self.name}: {error}"
             ]
         }
     
+    def _truncate(self, text: str, limit: int = 500) -> str:
+        """
+        Shorten text for log entries, marking the cut with "...".
+        
+        Args:
+            text: Text to shorten
+            limit: Maximum number of characters kept
+        
+        Returns:
+            text itself if it fits, otherwise its first limit characters + "..."
+        """
+        return text if len(text) <= limit else text[:limit] + "..."
+    
     def _log(self, message: str):
         """
-        Print a log message with agent name prefix.
+        Log a progress message with agent name prefix (INFO level).
         
         Args:
             message: Message to log
         """
-        print(f"[{self.name}] {message}")
\ No newline at end of file
+        logger.info("[%s] %s", self.name, message)
\ No newline at end of file
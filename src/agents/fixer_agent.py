@@ -3,53 +3,28 @@ Fixer Agent
 Reads the refactoring plan and modifies code to fix issues.
 """
 
-import json
+import ast
+import os
 import re
-from typing import Dict, Any, List
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 from .base_agent import BaseAgent
 from src.llm.client import LLMClient
 from src.tools.file_tools import FileTools
 from src.tools.analysis_tools import AnalysisTools
+from src.utils.jsonio import dumps_indent as _json_dumps_indent
 from src.utils.logger import log_experiment, ActionType
 
 
-class FixerAgent(BaseAgent):
-    """
-    The Fixer applies corrections to code based on the audit report.
-    """
-    
-    def __init__(self):
-        super().__init__("FixerAgent")
-        self.llm_client = LLMClient()
-        self.file_tools = FileTools()
-        self.analysis_tools = AnalysisTools()
-        self._load_prompt_template()
-    
-    def _load_prompt_template(self):
-        """Load the fixer prompt from file."""
-        try:
-            with open("src/prompts/fixer_prompt.txt", 'r', encoding='utf-8') as f:
-                self.prompt_template = f.read()
-            self._log("Prompt template loaded")
-        except FileNotFoundError:
-            self._log("Prompt template not found, using default")
-            self.prompt_template = self._get_default_prompt()
-    
-    def _get_default_prompt(self) -> str:
-        """Get default prompt template."""
-        return """You are an Expert Python Code Refactoring Specialist.
+# Fenced code blocks in LLM responses
+_PYTHON_FENCE_RE = re.compile(r'```python\s*\n(.*?)\n```', re.DOTALL)
+_FENCE_RE = re.compile(r'```\s*\n(.*?)\n```', re.DOTALL)
 
-TASK: Fix the issues identified in the audit report by modifying the code.
+_DEFAULT_PROMPT = """You are an Expert Python Code Refactoring Specialist.
 
-ORIGINAL CODE:
-```python
-{code}
-```
-
-AUDIT REPORT:
-{audit_report}
-
-{test_errors}
+TASK: Fix the issues identified in the audit report by modifying the code.
+The audit report, any test failures from the previous attempt, and the
+original code are given at the end of the request, in that order.
 
 REFACTORING INSTRUCTIONS:
 1. Fix ALL critical issues first (these are security/syntax/logic errors)
@@ -62,6 +37,7 @@ REFACTORING INSTRUCTIONS:
 5. Maintain the original functionality - DO NOT change what the code does
 6. Ensure all syntax is valid Python
 7. Follow PEP 8 style guidelines
+8. If test failures are listed, you MUST fix them in the code
 
 CRITICAL REQUIREMENTS:
 - Return ONLY the complete fixed Python code
@@ -71,6 +47,72 @@ CRITICAL REQUIREMENTS:
 - MUST include docstrings with triple quotes (''' or \"\"\") for all functions and classes
 
 IMPORTANT: Your response will be written directly to a .py file, so it must be pure Python code only."""
+
+# Placeholders of the prompt template -> pointers to the per-call sections,
+# which follow the static instructions
+_SECTION_REFERENCES = {
+    "{code}": "(the code to fix is at the end of the request)",
+    "{audit_report}": "(the audit report is at the end of the request)",
+    "{test_errors}": "",
+}
+_PLACEHOLDER_RE = re.compile("|".join(re.escape(p) for p in _SECTION_REFERENCES))
+
+# Lines announcing the code; the code starts on the next line
+_PREAMBLE_RE = re.compile(
+    r"here's the fixed|here is the fixed|fixed code:|corrected code:|refactored code:",
+    re.IGNORECASE
+)
+
+
+class FixerAgent(BaseAgent):
+    """
+    The Fixer applies corrections to code based on the audit report.
+    """
+    
+    _PROMPT_PATH = "src/prompts/fixer_prompt.txt"
+    
+    # Prompt template path -> (mtime, text); re-read only when the file changes
+    _PROMPT_CACHE: Dict[str, Tuple[float, str]] = {}
+    
+    def __init__(self):
+        super().__init__("FixerAgent")
+        self.llm_client = LLMClient.shared()
+        self.file_tools = FileTools()
+        self.analysis_tools = AnalysisTools()
+        self._load_prompt_template()
+    
+    def _load_prompt_template(self):
+        """
+        Load the fixer prompt from file (shared by all instances until edited).
+        
+        The template's placeholders are replaced by pointers once, giving a
+        static system prompt that is byte-identical on every call (a stable
+        prefix the provider can cache); code, audit report and test errors go
+        last, in the user prompt built by _prepare_fix_prompt.
+        """
+        cache = type(self)._PROMPT_CACHE
+        path = self._PROMPT_PATH
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            self._log("Prompt template not found, using default")
+            self.prompt_template = self._get_default_prompt()
+        else:
+            cached = cache.get(path)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, Path(path).read_text(encoding='utf-8'))
+                cache[path] = cached
+                self._log("Prompt template loaded")
+            self.prompt_template = cached[1]
+        
+        # One pass over the template; substituted text is never rescanned
+        self._system_prompt = _PLACEHOLDER_RE.sub(
+            lambda m: _SECTION_REFERENCES[m.group(0)], self.prompt_template
+        )
+    
+    def _get_default_prompt(self) -> str:
+        """Get default prompt template."""
+        return _DEFAULT_PROMPT
     
     def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -82,6 +124,79 @@ IMPORTANT: Your response will be written directly to a .py file, so it must be p
         Returns:
             State updates with fixed code
         """
+        result, job = self._prepare_fix(state)
+        if result is not None:
+            return result
+        
+        # Identical prompts are answered from the client's response cache
+        self._log("Calling LLM to generate fixes...")
+        try:
+            job["llm_response"] = self._call_llm_streaming(job["prompt"])
+        except Exception as e:
+            self._log(f"LLM call failed: {e}")
+            return self._create_error_result(state, f"LLM error: {e}")
+        
+        return self._finish_fix(state, job)
+    
+    def _call_llm_streaming(self, prompt: str) -> str:
+        """
+        Stream the fix and stop as soon as a fenced python block closes:
+        _extract_code keeps only that block, so the rest would be wasted
+        output tokens.
+        
+        Args:
+            prompt: User prompt from _prepare_fix_prompt
+        
+        Returns:
+            The response text received
+        """
+        text = ""
+        stream = self.llm_client.call_stream(prompt, temperature=0.1, system=self._system_prompt)
+        try:
+            for chunk in stream:
+                text += chunk
+                if self._fence_closed(text, chunk):
+                    self._log("Code block complete, stopping generation")
+                    # The client only caches fully read streams
+                    self.llm_client.remember(prompt, text, temperature=0.1, system=self._system_prompt)
+                    break
+        finally:
+            stream.close()
+        
+        if not text:
+            raise ValueError("Empty response from LLM")
+        return text
+    
+    def _fence_closed(self, text: str, chunk: str) -> bool:
+        """
+        Check whether text already holds the block _extract_code would return.
+        
+        The first complete ```python block cannot change as more text
+        arrives, and a closing fence always ends with a backtick, so the
+        regex only runs on chunks containing one.
+        
+        Args:
+            text: Response received so far
+            chunk: Last chunk appended to text
+        
+        Returns:
+            True once a fenced python block is complete
+        """
+        if "`" not in chunk:
+            return False
+        return _PYTHON_FENCE_RE.search(text) is not None
+    
+    def _prepare_fix(self, state: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Everything before the LLM call: inputs and prompt.
+        
+        Args:
+            state: Current workflow state
+        
+        Returns:
+            (state updates, {}) on error, otherwise (None, job) where job,
+            once its llm_response is set, feeds _finish_fix
+        """
         current_file = state.get('current_file', 'unknown')
         iteration = state.get('iteration', 1)
         self._log(f"Fixing: {current_file} (iteration {iteration})")
@@ -97,7 +212,7 @@ IMPORTANT: Your response will be written directly to a .py file, so it must be p
             self._log("Using previously fixed code as base")
         
         if not code:
-            return self._create_error_result(state, "No code to fix")
+            return self._create_error_result(state, "No code to fix"), {}
         
         if not audit_report:
             self._log("No audit report found, attempting basic fixes")
@@ -106,24 +221,49 @@ IMPORTANT: Your response will be written directly to a .py file, so it must be p
         # Prepare the prompt
         prompt = self._prepare_fix_prompt(code, audit_report, test_errors)
         
-        # Call LLM to fix the code
-        self._log("Calling LLM to generate fixes...")
-        try:
-            llm_response = self.llm_client.call(prompt, temperature=0.1)
-        except Exception as e:
-            self._log(f"LLM call failed: {e}")
-            return self._create_error_result(state, f"LLM error: {e}")
+        return None, {
+            "current_file": current_file,
+            "iteration": iteration,
+            "code": code,
+            "audit_report": audit_report,
+            "test_errors": test_errors,
+            "prompt": prompt,
+            "llm_response": None,
+        }
+    
+    def _finish_fix(self, state: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Everything after the LLM call: extract, validate, save, log.
+        
+        Args:
+            state: Current workflow state
+            job: Second item returned by _prepare_fix, with llm_response set
+        
+        Returns:
+            State updates with fixed code
+        """
+        current_file = job["current_file"]
+        iteration = job["iteration"]
+        code = job["code"]
+        llm_response = job["llm_response"]
         
         # Extract and clean the fixed code
         fixed_code = self._extract_code(llm_response)
         
-        # Validate syntax
-        syntax_check = self.analysis_tools.check_syntax(fixed_code)
+        # Validate syntax; the tree is reused for the docstring count
+        tree, syntax_check = self.analysis_tools.parse_code(fixed_code)
         if not syntax_check["valid"]:
             self._log(f"  Fixed code has syntax error: {syntax_check['error']}")
+            # Never replay this answer for the same prompt
+            self.llm_client.forget(job["prompt"], temperature=0.1, system=self._system_prompt)
             # Try to fix syntax issues
             fixed_code = self._attempt_syntax_fix(fixed_code, syntax_check)
         
+        # Unchanged output needs no docstring recount
+        code_changed = fixed_code != code
+        if not code_changed:
+            self._log("  LLM returned the code unchanged")
+        
         # Save to sandbox
         try:
             sandbox_path = self.file_tools.get_sandbox_path(
@@ -141,12 +281,16 @@ IMPORTANT: Your response will be written directly to a .py file, so it must be p
             details={
                 "file_fixed": current_file,
                 "iteration": iteration,
-                "input_prompt": prompt[:1000] + "..." if len(prompt) > 1000 else prompt,
-                "output_response": llm_response[:1000] + "..." if len(llm_response) > 1000 else llm_response,
-                "issues_addressed": self._count_issues(audit_report),
-                "test_errors_count": len(test_errors),
+                "input_prompt": self._truncate(job["prompt"], limit=1000),
+                "output_response": self._truncate(llm_response, limit=1000),
+                "issues_addressed": self._count_issues(job["audit_report"]),
+                "test_errors_count": len(job["test_errors"]),
                 "syntax_valid": syntax_check["valid"],
-                "docstrings_added": self._count_docstrings(fixed_code) > self._count_docstrings(code)
+                "code_changed": code_changed,
+                "docstrings_added": (
+                    code_changed
+                    and self._count_docstrings(fixed_code, tree) > self._count_docstrings(code)
+                )
             },
             status="SUCCESS" if syntax_check["valid"] else "FAILURE"
         )
@@ -157,10 +301,10 @@ IMPORTANT: Your response will be written directly to a .py file, so it must be p
             "fix_result": {
                 "iteration": iteration,
                 "syntax_valid": syntax_check["valid"],
+                "code_changed": code_changed,
                 "code_length": len(fixed_code)
             },
             "agent_outputs": {
-                **(state.get("agent_outputs") or {}),
                 "fix_result": {
                     "iteration": iteration,
                     "syntax_valid": syntax_check["valid"]
@@ -169,28 +313,21 @@ IMPORTANT: Your response will be written directly to a .py file, so it must be p
         }
     
     def _prepare_fix_prompt(self, code: str, audit_report: Dict, test_errors: List[str]) -> str:
-        """Prepare the fix prompt with all context."""
-        prompt = self.prompt_template
-        
-        # Insert code
-        prompt = prompt.replace("{code}", code)
-        
-        # Insert audit report
-        audit_json = json.dumps(audit_report, indent=2)
-        prompt = prompt.replace("{audit_report}", audit_json)
+        """
+        Prepare the per-call user prompt; it follows the static system
+        prompt, with the code last.
+        """
+        parts = ["AUDIT REPORT:\n", _json_dumps_indent(audit_report), "\n"]
         
         # Insert test errors if any
         if test_errors:
-            error_text = "\nTEST FAILURES FROM PREVIOUS ATTEMPT:\n"
+            parts.append("\nTEST FAILURES FROM PREVIOUS ATTEMPT:\n")
             for i, error in enumerate(test_errors, 1):
-                error_text += f"\nError {i}:\n{error}\n"
-            error_text += "\nYou MUST fix these test failures in the code.\n"
-        else:
-            error_text = ""
-        
-        prompt = prompt.replace("{test_errors}", error_text)
+                parts.append(f"\nError {i}:\n{error}\n")
+            parts.append("\nYou MUST fix these test failures in the code.\n")
         
-        return prompt
+        parts += ["\nORIGINAL CODE:\n```python\n", code, "\n```\n"]
+        return "".join(parts)
     
     def _extract_code(self, response: str) -> str:
         """
@@ -207,33 +344,24 @@ IMPORTANT: Your response will be written directly to a .py file, so it must be p
         
         # Remove markdown code blocks if present
         if "```python" in response:
-            match = re.search(r'```python\s*\n(.*?)\n```', response, re.DOTALL)
+            match = _PYTHON_FENCE_RE.search(response)
             if match:
                 return match.group(1).strip()
         elif "```" in response:
-            match = re.search(r'```\s*\n(.*?)\n```', response, re.DOTALL)
+            match = _FENCE_RE.search(response)
             if match:
                 return match.group(1).strip()
         
-        # Remove common preambles
-        lines = response.split('\n')
-        start_idx = 0
-        
-        for i, line in enumerate(lines):
-            lower = line.lower().strip()
-            if any(phrase in lower for phrase in [
-                "here's the fixed",
-                "here is the fixed",
-                "fixed code:",
-                "corrected code:",
-                "refactored code:"
-            ]):
-                start_idx = i + 1
-                break
-        
-        code = '\n'.join(lines[start_idx:]).strip()
+        # Remove common preambles: slice after the first announcing line
+        # instead of splitting the whole response into lines
+        match = _PREAMBLE_RE.search(response)
+        if match is None:
+            return response
         
-        return code
+        line_end = response.find('\n', match.end())
+        if line_end == -1:
+            return ""
+        return response[line_end + 1:].strip()
     
     def _attempt_syntax_fix(self, code: str, syntax_check: Dict) -> str:
         """
@@ -258,6 +386,24 @@ IMPORTANT: Your response will be written directly to a .py file, so it must be p
             len(audit_report.get("minor_issues", []))
         )
     
-    def _count_docstrings(self, code: str) -> int:
-        """Count docstrings in code."""
-        return code.count('"""') // 2 + code.count("'''") // 2
\ No newline at end of file
+    def _count_docstrings(self, code: str, tree: Optional[ast.AST] = None) -> int:
+        """
+        Count module, class and function docstrings.
+        
+        Args:
+            code: Python code as string
+            tree: AST of code if already parsed
+        
+        Returns:
+            Number of docstrings, 0 if the code does not parse
+        """
+        if tree is None:
+            tree, _ = self.analysis_tools.parse_code(code)
+            if tree is None:
+                return 0
+        
+        return sum(
+            1 for node in ast.walk(tree)
+            if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef))
+            and ast.get_docstring(node, clean=False) is not None
+        )
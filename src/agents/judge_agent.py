@@ -4,6 +4,7 @@ Executes unit tests and validates that fixes work correctly.
 """
 
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any
 from .base_agent import BaseAgent
@@ -12,6 +13,10 @@ from src.tools.file_tools import FileTools
 from src.tools.analysis_tools import AnalysisTools
 from src.utils.logger import log_experiment, ActionType
 
+# Pylint runs here while the tests run on the caller's thread; one pool is
+# shared by every JudgeAgent so instances do not each keep an idle thread
+_PYLINT_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="judge-pylint")
+
 
 class JudgeAgent(BaseAgent):
     """
@@ -79,19 +84,35 @@ class JudgeAgent(BaseAgent):
                 errors=[f"Runtime error: {run_result['error']}"]
             )
         
-        # Step 3: Check code quality improvement
-        self._log("Checking code quality...")
-        pylint_result = self.analysis_tools.run_pylint(test_file)
-        new_score = pylint_result.get("score", 0.0)
-        original_score = state.get("agent_outputs", {}).get("original_pylint_score", 0.0)
-        
-        self._log(f"Pylint score: {original_score:.2f} -> {new_score:.2f}")
+        # Step 3: Check code quality while the tests run; pylint only reads test_file.
+        # Code identical to the audited original keeps the auditor's score.
+        # The auditor linted current_file, not test_file: the two runs can
+        # only differ through the path (module name, relative imports), so
+        # the score of unchanged code is the auditor's by definition and
+        # re-linting it under another name would only add path noise.
+        original_score = state.get("agent_outputs", {}).get("original_pylint_score")
+        if original_score is not None and fixed_code == state.get("file_content"):
+            self._log("Code unchanged since the audit, reusing its pylint score")
+            pylint_future = None
+        else:
+            self._log("Checking code quality...")
+            pylint_future = _PYLINT_POOL.submit(self.analysis_tools.run_pylint, test_file)
         
         # Step 4: Create or run tests
         self._log("Running tests...")
         test_result = self._run_tests(test_file, fixed_code)
         
-        # Step 5: Determine if we passed
+        # Step 5: Collect the quality check
+        if original_score is None:
+            original_score = 0.0
+        if pylint_future is None:
+            new_score = original_score
+        else:
+            new_score = pylint_future.result().get("score", 0.0)
+        
+        self._log(f"Pylint score: {original_score:.2f} -> {new_score:.2f}")
+        
+        # Step 6: Determine if we passed
         passed = self._evaluate_success(
             syntax_valid=syntax_check["valid"],
             runs_without_error=run_result["success"],
@@ -237,7 +258,6 @@ class JudgeAgent(BaseAgent):
             },
             "current_phase": "done",
             "agent_outputs": {
-                **(state.get("agent_outputs") or {}),
                 "final_pylint_score": score
             }
         }
@@ -278,7 +298,6 @@ class JudgeAgent(BaseAgent):
                 "retry_count": retry_count + 1,
                 "current_phase": "retry",  # Will route back to fix
                 "agent_outputs": {
-                    **(state.get("agent_outputs") or {}),
                     "test_failures": errors
                 }
             }
@@ -292,7 +311,6 @@ class JudgeAgent(BaseAgent):
                 },
                 "current_phase": "error",
                 "agent_outputs": {
-                    **(state.get("agent_outputs") or {}),
                     "test_failures": errors,
                     "max_iterations_reached": True
                 }
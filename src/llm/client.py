@@ -3,9 +3,26 @@ LLM Client for Google Gemini
 Provides a simple interface for calling the Gemini API.
 """
 
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
 import google.generativeai as genai
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+# Appended to prompts that do not already ask for JSON
+JSON_INSTRUCTION = "\n\nIMPORTANT: Return ONLY valid JSON. No explanations or markdown."
+
+# Responses are only reused for near-deterministic calls
+_CACHE_MAX_TEMPERATURE = 0.2
+# Age after which a response cached on disk is ignored
+_DISK_CACHE_TTL = 7 * 86400
+
+logger = logging.getLogger("llm")
 
 
 class LLMClient:
@@ -14,6 +31,31 @@ class LLMClient:
     Handles API key configuration and model interactions.
     """
     
+    # Process-wide SDK state shared by all instances (Auditor, Fixer, Judge)
+    _configured_api_key: Optional[str] = None
+    _models: Dict[Tuple[str, Optional[str]], Any] = {}
+    _shared_clients: Dict[Optional[str], "LLMClient"] = {}
+    
+    @classmethod
+    def shared(cls, model_name: Optional[str] = None) -> "LLMClient":
+        """
+        Get the process-wide client for a model, creating it on first use.
+        
+        Agents share one client (and so one SDK transport) instead of each
+        building their own.
+        
+        Args:
+            model_name: Model to use (same default as the constructor)
+        
+        Returns:
+            The shared LLMClient
+        """
+        client = cls._shared_clients.get(model_name)
+        if client is None or cls._configured_api_key != os.getenv("GOOGLE_API_KEY"):
+            client = cls(model_name)
+            cls._shared_clients[model_name] = client
+        return client
+    
     def __init__(self, model_name: Optional[str] = None):
         """
         Initialize the LLM client.
@@ -26,22 +68,206 @@ class LLMClient:
         if not api_key:
             raise ValueError("GOOGLE_API_KEY not found in environment variables")
         
-        # Configure Gemini
-        genai.configure(api_key=api_key)
+        # Configure Gemini once per process: genai.configure() rebuilds the
+        # SDK's API clients, dropping connections other agents already opened
+        cls = type(self)
+        if cls._configured_api_key != api_key:
+            genai.configure(api_key=api_key)
+            cls._configured_api_key = api_key
+            cls._models.clear()
         
         # Set model (use gemini-2.5-flash - confirmed working)
         self.model_name = model_name or "gemini-2.5-flash"
-        self.model = genai.GenerativeModel(self.model_name)
+        self.model = self._get_model()
+        
+        # Responses of call by request hash (least recently used first)
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._cache_cap = 512
+        self._cache_lock = threading.Lock()
+        # Below the in-memory cache: one JSON file per response, kept across
+        # runs. Opt-in through HIVEMIND_CACHE_DIR; HIVEMIND_DISK_CACHE=0 wins.
+        cache_dir = os.getenv("HIVEMIND_CACHE_DIR")
+        disk_cache = os.getenv("HIVEMIND_DISK_CACHE", "1") != "0"
+        self.cache_dir: Optional[Path] = Path(cache_dir) if cache_dir and disk_cache else None
+        
+        logger.info("[LLM] LLM Client initialized: %s", self.model_name)
+    
+    def _get_model(self, system: Optional[str] = None) -> Any:
+        """
+        Get the shared GenerativeModel for this model name and system prompt.
+        
+        A system prompt is sent as the model's system_instruction, ahead of
+        the user content, so the static part of repeated calls forms a stable
+        prefix the provider can cache.
+        
+        Args:
+            system: Static instructions, or None for a plain model
+        
+        Returns:
+            A GenerativeModel shared by every agent's client
+        """
+        cls = type(self)
+        key = (self.model_name, system)
+        model = cls._models.get(key)
+        if model is None:
+            if system is None:
+                model = genai.GenerativeModel(self.model_name)
+            else:
+                model = genai.GenerativeModel(self.model_name, system_instruction=system)
+            cls._models[key] = model
+        return model
+    
+    def _cache_key(self, prompt: str, temperature: float,
+                   system: Optional[str]) -> Optional[bytes]:
+        """
+        Hash a request into a response cache key.
+        
+        Args:
+            prompt: The prompt to send
+            temperature: Sampling temperature
+            system: System prompt, if any
+        
+        Returns:
+            BLAKE2b digest, or None when the temperature is too high to reuse
+            responses
+        """
+        if temperature > _CACHE_MAX_TEMPERATURE:
+            return None
+        digest = hashlib.blake2b(f"{self.model_name}|{temperature}|".encode('utf-8'), digest_size=16)
+        if system is not None:
+            digest.update(system.encode('utf-8', 'surrogatepass'))
+        digest.update(b"\0")
+        digest.update(prompt.encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+    
+    def _cached(self, key: Optional[bytes]) -> Optional[str]:
+        """Look up a cached response in memory, then on disk."""
+        if key is None:
+            return None
+        with self._cache_lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                return text
+        
+        text = self._load_from_disk(key)
+        if text is not None:
+            self._remember(key, text, persist=False)
+        return text
+    
+    def _remember(self, key: Optional[bytes], text: str, persist: bool = True):
+        """Cache a response, evicting the least recently used beyond the cap."""
+        if key is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_cap:
+                self._cache.popitem(last=False)
+        if persist:
+            self._save_to_disk(key, text)
+    
+    def _load_from_disk(self, key: bytes) -> Optional[str]:
+        """
+        Load a response cached by an earlier run.
+        
+        Args:
+            key: Key from _cache_key
+        
+        Returns:
+            The response text, or None if missing or older than the TTL
+        """
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self.cache_dir / f"{key.hex()}.json", 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(entry, dict) or not isinstance(entry.get("text"), str):
+            return None
+        if time.time() - entry.get("created", 0) > _DISK_CACHE_TTL:
+            return None
+        return entry["text"]
+    
+    def _save_to_disk(self, key: bytes, text: str):
+        """
+        Store a response for later runs; a failed write only disables caching.
+        
+        Args:
+            key: Key from _cache_key
+            text: Response text
+        """
+        if self.cache_dir is None:
+            return
+        cache_file = self.cache_dir / f"{key.hex()}.json"
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({"created": time.time(), "text": text}, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.warning("[LLM] Could not write response cache: %s", e)
+    
+    def remember(self, prompt: str, text: str, temperature: float = 0.1,
+                 system: Optional[str] = None):
+        """
+        Cache a response the caller cut short on purpose, e.g. a stream
+        closed once the part it needs is complete, so the next identical
+        call is answered without the API.
+        
+        Args:
+            prompt: The prompt that was sent
+            text: Response text the caller kept
+            temperature: Sampling temperature used
+            system: System prompt used (optional)
+        """
+        key = self._cache_key(prompt, temperature, system)
+        if key is None:
+            return
+        with self._cache_lock:
+            if self._cache.get(key) == text:
+                # Already cached, e.g. the stream was served from the cache
+                return
+        self._remember(key, text)
+    
+    def forget(self, prompt: str, temperature: float = 0.1,
+               system: Optional[str] = None):
+        """
+        Drop a cached response, e.g. one the caller found unusable, so the
+        next identical call asks the model again.
         
-        print(f"[LLM] LLM Client initialized: {self.model_name}")
+        Args:
+            prompt: The prompt that was sent
+            temperature: Sampling temperature used
+            system: System prompt used (optional)
+        """
+        key = self._cache_key(prompt, temperature, system)
+        if key is not None:
+            with self._cache_lock:
+                self._cache.pop(key, None)
+            if self.cache_dir is None:
+                return
+            try:
+                (self.cache_dir / f"{key.hex()}.json").unlink()
+            except OSError:
+                pass
     
-    def call(self, prompt: str, temperature: float = 0.1) -> str:
+    def call(self, prompt: str, temperature: float = 0.1,
+             system: Optional[str] = None) -> str:
         """
         Call the LLM with a prompt.
         
+        Identical low-temperature requests are answered from an in-memory
+        LRU cache, or from the on-disk cache of earlier runs, without calling
+        the API.
+        
         Args:
             prompt: The prompt to send
             temperature: Sampling temperature (0.0 = deterministic, 1.0 = creative)
+            system: Static instructions sent as the system prompt (optional)
         
         Returns:
             The LLM's response as a string
@@ -49,6 +275,11 @@ class LLMClient:
         Raises:
             Exception: If the API call fails
         """
+        key = self._cache_key(prompt, temperature, system)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        
         try:
             # Configure generation
             generation_config = genai.types.GenerationConfig(
@@ -57,7 +288,7 @@ class LLMClient:
             )
             
             # Generate response
-            response = self.model.generate_content(
+            response = self._get_model(system).generate_content(
                 prompt,
                 generation_config=generation_config
             )
@@ -66,10 +297,111 @@ class LLMClient:
             if not response.text:
                 raise ValueError("Empty response from LLM")
             
+            self._remember(key, response.text)
             return response.text
         
         except Exception as e:
-            print(f"[LLM] LLM API Error: {e}")
+            logger.error("[LLM] LLM API Error: %s", e)
+            raise
+    
+    def call_stream(self, prompt: str, temperature: float = 0.1,
+                    system: Optional[str] = None) -> Iterator[str]:
+        """
+        Call the LLM and yield the response text as it is generated.
+        
+        Shares call's response cache: a cached response is yielded as one
+        chunk, and a response is cached only once the caller has consumed
+        the whole stream. A caller that closes the stream early because it
+        has what it needs can cache that text with remember().
+        
+        Args:
+            prompt: The prompt to send
+            temperature: Sampling temperature
+            system: Static instructions sent as the system prompt (optional)
+        
+        Yields:
+            Successive chunks of the response text
+        
+        Raises:
+            Exception: If the API call fails
+        """
+        key = self._cache_key(prompt, temperature, system)
+        cached = self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        try:
+            generation_config = genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=8000,
+            )
+            
+            response = self._get_model(system).generate_content(
+                prompt,
+                generation_config=generation_config,
+                stream=True
+            )
+            
+            parts = []
+            for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            
+            if parts:
+                self._remember(key, "".join(parts))
+        
+        except Exception as e:
+            logger.error("[LLM] LLM API Error: %s", e)
+            raise
+    
+    async def call_stream_async(self, prompt: str, temperature: float = 0.1,
+                                system: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Async version of call_stream, for running several calls concurrently.
+        Shares the same response cache rules.
+        
+        Args:
+            prompt: The prompt to send
+            temperature: Sampling temperature
+            system: Static instructions sent as the system prompt (optional)
+        
+        Yields:
+            Successive chunks of the response text
+        
+        Raises:
+            Exception: If the API call fails
+        """
+        key = self._cache_key(prompt, temperature, system)
+        cached = self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        try:
+            generation_config = genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=8000,
+            )
+            
+            response = await self._get_model(system).generate_content_async(
+                prompt,
+                generation_config=generation_config,
+                stream=True
+            )
+            
+            parts = []
+            async for chunk in response:
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield chunk.text
+            
+            if parts:
+                self._remember(key, "".join(parts))
+        
+        except Exception as e:
+            logger.error("[LLM] LLM API Error: %s", e)
             raise
     
     def call_with_json(self, prompt: str) -> str:
@@ -85,6 +417,6 @@ class LLMClient:
         """
         # Add JSON instruction if not present
         if "json" not in prompt.lower():
-            prompt += "\n\nIMPORTANT: Return ONLY valid JSON. No explanations or markdown."
+            prompt += JSON_INSTRUCTION
         
-        return self.call(prompt, temperature=0.0)
\ No newline at end of file
+        return self.call(prompt, temperature=0.0)
@@ -5,6 +5,7 @@ Teste que les agents Auditor, Fixer, Judge fonctionnent ensemble.
 
 import json
 import os
+from datetime import datetime
 from typing import Dict, Any, List, Tuple
 
 
@@ -231,7 +232,6 @@ class AgentPipeline:
     @staticmethod
     def _get_timestamp() -> str:
         """Retourner un timestamp ISO 8601."""
-        from datetime import datetime
         return datetime.now().isoformat() + "Z"
 
 
@@ -4,10 +4,70 @@ Provides pylint integration and code analysis utilities.
 """
 
 import subprocess
+import hashlib
 import json
 import ast
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from importlib import metadata
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.jsonio import loads as _json_loads, dumps_bytes as _json_dumps_bytes
+
+
+# Possible pylint score formats, tried in order
+_SCORE_PATTERNS = (
+    re.compile(r'rated at\s+([0-9.]+)/10'),  # "rated at X.XX/10"
+    re.compile(r'Your code has been rated at\s+([0-9.]+)/10'),
+    re.compile(r'Score:\s+([0-9.]+)/10'),
+    re.compile(r'([0-9.]+)/10'),  # Just find any X.XX/10 pattern
+)
+
+# Tool progress messages; main.py shows them at INFO level
+logger = logging.getLogger("tools")
+
+# Command-line options shared by every pylint run (part of the cache key)
+_PYLINT_OPTIONS = ("--output-format=json",)
+# Checkers that compare files with each other: a batched run would report
+# issues a single-file run never sees, and cache them per file
+_BATCH_DISABLED = ("--disable=duplicate-code,cyclic-import",)
+# Files pylint reads its configuration from, relative to the working directory
+_PYLINT_CONFIG_FILES = (
+    "pylintrc", "pylintrc.toml", ".pylintrc", ".pylintrc.toml",
+    "pyproject.toml", "setup.cfg", "tox.ini",
+)
+# Age after which a cached pylint result is ignored and removed
+_CACHE_TTL = 7 * 86400
+
+
+_pylint_version_cache: Optional[str] = None
+
+
+def _pylint_version() -> str:
+    """
+    Installed pylint version, looked up once per process.
+    
+    Package metadata is read first; `pylint --version` is only run when
+    pylint is installed outside this environment (e.g. with pipx).
+    """
+    global _pylint_version_cache
+    if _pylint_version_cache is None:
+        try:
+            _pylint_version_cache = metadata.version("pylint")
+        except metadata.PackageNotFoundError:
+            try:
+                result = subprocess.run(
+                    ["pylint", "--version"], capture_output=True, text=True, timeout=30
+                )
+                _pylint_version_cache = result.stdout.strip()
+            except (OSError, subprocess.SubprocessError):
+                _pylint_version_cache = "unknown"
+    return _pylint_version_cache
 
 
 class AnalysisTools:
@@ -17,11 +77,22 @@ class AnalysisTools:
     
     def __init__(self):
         """Initialize analysis tools."""
-        print("[ANALYSIS] Analysis tools initialized")
+        # Pylint results of this process, keyed like the disk cache
+        self._pylint_memo: Dict[str, Dict[str, Any]] = {}
+        # Pylint results by file path and content, kept across runs
+        # unless HIVEMIND_DISK_CACHE=0
+        self.cache_dir = Path(".cache") / "pylint"
+        self.disk_cache = os.getenv("HIVEMIND_DISK_CACHE", "1") != "0"
+        self._fingerprint: Optional[bytes] = None
+        logger.info("[ANALYSIS] Analysis tools initialized")
     
     def run_pylint(self, file_path: str) -> Dict[str, Any]:
         """
         Run pylint on a Python file with enhanced scoring.
+        
+        A result already computed in this process (e.g. prefetched by
+        run_pylint_many), or cached on disk, for the same path and content
+        is returned without starting pylint again.
         """
         path = Path(file_path)
         
@@ -34,39 +105,40 @@ class AnalysisTools:
             }
         
         try:
+            cache_key = self._disk_key(path)
+            cached = self._pylint_memo.get(cache_key)
+            if cached is not None:
+                logger.info("[ANALYSIS] Pylint result reused for %s", path.name)
+                return cached
+            
+            cached = self._load_cached_result(cache_key)
+            if cached is not None:
+                logger.info("[ANALYSIS] Pylint cache hit for %s", path.name)
+                self._pylint_memo[cache_key] = cached
+                return cached
+            
             # Run pylint with JSON output
             result = subprocess.run(
-                ["pylint", str(path), "--output-format=json"],
+                ["pylint", str(path), *_PYLINT_OPTIONS],
                 capture_output=True,
                 text=True,
                 timeout=30
             )
             
             # Parse JSON output
+            parsed = True
             try:
-                issues = json.loads(result.stdout) if result.stdout else []
+                issues = _json_loads(result.stdout) if result.stdout else []
             except json.JSONDecodeError:
                 issues = []
+                parsed = False
             
-            # **AMÉLIORATION : Calculer notre propre score**
-            score = self._calculate_enhanced_score(issues, result.stderr)
-            
-            print(f"[ANALYSIS] Pylint score: {score:.2f}/10 ({len(issues)} issues)")
-            
-            # Afficher les types d'issues pour debug
-            if issues:
-                types = {}
-                for issue in issues:
-                    t = issue.get('type', 'unknown')
-                    types[t] = types.get(t, 0) + 1
-                print(f"[ANALYSIS] Issues by type: {types}")
-            
-            return {
-                "score": score,
-                "issues": issues,
-                "issue_count": len(issues),
-                "raw_output": result.stderr[:500] if result.stderr else ""
-            }
+            pylint_result = self._pylint_result(issues, result.stderr)
+            # Neither a usage error nor unreadable output is worth keeping
+            if parsed and not result.returncode & 32:
+                self._pylint_memo[cache_key] = pylint_result
+                self._save_cached_result(cache_key, pylint_result)
+            return pylint_result
         
         except Exception as e:
             return {
@@ -76,13 +148,203 @@ class AnalysisTools:
                 "raw_output": ""
             }
     
-    def _calculate_enhanced_score(self, issues: List[Dict], stderr: str) -> float:
+    def run_pylint_many(self, file_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Run pylint once over several files, paying its startup cost once.
+        
+        Files with a cached result are not analyzed again. Results are
+        remembered so that a later run_pylint on an unchanged file returns
+        them directly.
+        
+        Args:
+            file_paths: Python files to analyze
+        
+        Returns:
+            Mapping of each existing file path to its run_pylint result
+        """
+        results = {}
+        keys = {}
+        for file_path in file_paths:
+            path = Path(file_path)
+            if not path.exists():
+                continue
+            # Hash file contents before pylint reads them
+            cache_key = self._disk_key(path)
+            cached = self._pylint_memo.get(cache_key)
+            if cached is None:
+                cached = self._load_cached_result(cache_key)
+            if cached is not None:
+                self._pylint_memo[cache_key] = results[file_path] = cached
+            else:
+                keys[file_path] = (os.path.abspath(path), cache_key)
+        
+        if len(keys) == 1:
+            file_path = next(iter(keys))
+            results[file_path] = self.run_pylint(file_path)
+            return results
+        if not keys:
+            return results
+        
+        try:
+            result = subprocess.run(
+                ["pylint", *keys, *_PYLINT_OPTIONS, *_BATCH_DISABLED],
+                capture_output=True,
+                text=True,
+                timeout=30 + 5 * len(keys)
+            )
+            if result.returncode & 32:
+                # Usage error: nothing was analyzed
+                logger.warning("[ANALYSIS] Batched pylint failed: %s", result.stderr[:200])
+                return results
+            try:
+                issues = _json_loads(result.stdout) if result.stdout else []
+            except json.JSONDecodeError:
+                # Issues cannot be attributed to files: let run_pylint retry
+                logger.warning("[ANALYSIS] Batched pylint output is not valid JSON")
+                return results
+        except Exception as e:
+            logger.warning("[ANALYSIS] Batched pylint failed: %s", e)
+            return results
+        
+        # Split issues back per file; pylint reports paths relative to cwd
+        by_file = {key[0]: [] for key in keys.values()}
+        for issue in issues:
+            owner = os.path.abspath(issue.get('path', ''))
+            if owner in by_file:
+                by_file[owner].append(issue)
+        
+        # The score line covers every file together, so score each from its issues
+        for file_path, (abs_path, cache_key) in keys.items():
+            results[file_path] = self._pylint_result(by_file[abs_path], "")
+            self._pylint_memo[cache_key] = results[file_path]
+            self._save_cached_result(cache_key, results[file_path])
+        
+        return results
+    
+    def _disk_key(self, path: Path) -> str:
+        """
+        Hash a file's path and content into a pylint cache key.
+        
+        The path is part of the key because pylint reports it and derives
+        the module name from it; the pylint version and configuration are
+        part of it because they change the reported issues.
+        """
+        digest = hashlib.sha256(self._pylint_fingerprint())
+        digest.update(os.path.abspath(path).encode('utf-8', 'surrogatepass'))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        return digest.hexdigest()
+    
+    def _pylint_fingerprint(self) -> bytes:
+        """
+        Digest of the pylint version, options and configuration files,
+        computed on first use.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256(_pylint_version().encode('utf-8'))
+            digest.update("\0".join(_PYLINT_OPTIONS).encode('utf-8'))
+            config_files = [Path(name) for name in _PYLINT_CONFIG_FILES]
+            if os.environ.get("PYLINTRC"):
+                config_files.append(Path(os.environ["PYLINTRC"]))
+            config_files += [Path.home() / ".pylintrc", Path.home() / ".config" / "pylintrc"]
+            for config_file in config_files:
+                digest.update(b"\0" + str(config_file).encode('utf-8', 'surrogatepass') + b"\0")
+                try:
+                    digest.update(config_file.read_bytes())
+                except OSError:
+                    pass
+            self._fingerprint = digest.digest()
+        return self._fingerprint
+    
+    def _load_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a cached pylint result.
+        
+        Args:
+            cache_key: Key from _disk_key
+        
+        Returns:
+            The run_pylint result, or None on a cache miss
+        """
+        if not self.disk_cache:
+            return None
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        try:
+            if time.time() - cache_file.stat().st_mtime > _CACHE_TTL:
+                cache_file.unlink()
+                return None
+            with open(cache_file, 'rb') as f:
+                cached = _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(cached, dict) or not isinstance(cached.get("issues"), list):
+            return None
+        return cached
+    
+    def _save_cached_result(self, cache_key: str, pylint_result: Dict[str, Any]):
+        """
+        Store a pylint result; a failed write only disables caching.
+        
+        Args:
+            cache_key: Key from _disk_key
+            pylint_result: Result to store
+        """
+        if not self.disk_cache:
+            return
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                f.write(_json_dumps_bytes(pylint_result))
+            os.replace(tmp_file, cache_file)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("[ANALYSIS] Could not write pylint cache: %s", e)
+    
+    def _pylint_result(self, issues: List[Dict], stderr: str) -> Dict[str, Any]:
+        """
+        Build a run_pylint result from parsed pylint issues.
+        
+        Args:
+            issues: Pylint issues of one file
+            stderr: Pylint error output
+        
+        Returns:
+            Dict with score, issues, issue_count and raw_output
+        """
+        # Un seul passage sur les issues, partagé par le score et le debug
+        types = Counter(issue.get('type', 'unknown') for issue in issues)
+        
+        # **AMÉLIORATION : Calculer notre propre score**
+        score = self._calculate_enhanced_score(issues, stderr, types)
+        
+        logger.info("[ANALYSIS] Pylint score: %.2f/10 (%d issues)", score, len(issues))
+        
+        # Afficher les types d'issues pour debug
+        if issues:
+            logger.info("[ANALYSIS] Issues by type: %s", dict(types))
+        
+        return {
+            "score": score,
+            "issues": issues,
+            "issue_count": len(issues),
+            "raw_output": stderr[:500] if stderr else ""
+        }
+    
+    def _calculate_enhanced_score(
+        self,
+        issues: List[Dict],
+        stderr: str,
+        type_counts: Optional[Counter] = None
+    ) -> float:
         """
         Calculate a more useful quality score.
         
         Args:
             issues: List of pylint issues
             stderr: Pylint error output
+            type_counts: Issue counts by pylint type, if already computed
         
         Returns:
             Score from 0.0 to 10.0
@@ -99,18 +361,12 @@ class AnalysisTools:
             return 8.0  # Code sans issues = bon
         
         # Compter les issues par sévérité
-        error_count = 0
-        warning_count = 0
-        convention_count = 0
+        if type_counts is None:
+            type_counts = Counter(issue.get('type', 'convention') for issue in issues)
         
-        for issue in issues:
-            issue_type = issue.get('type', 'convention')
-            if issue_type in ['error', 'fatal']:
-                error_count += 1
-            elif issue_type == 'warning':
-                warning_count += 1
-            else:
-                convention_count += 1
+        error_count = type_counts['error'] + type_counts['fatal']
+        warning_count = type_counts['warning']
+        convention_count = len(issues) - error_count - warning_count
         
         # Calcul du score (basé sur le nombre et sévérité des issues)
         # Formule : 10 - (erreurs * 0.5) - (warnings * 0.2) - (conventions * 0.05)
@@ -122,7 +378,10 @@ class AnalysisTools:
         # S'assurer que le score est entre 0 et 10
         calculated_score = max(0.0, min(10.0, calculated_score))
         
-        print(f"[ANALYSIS] Calculated score: errors={error_count}, warnings={warning_count}, conventions={convention_count}")
+        logger.info(
+            "[ANALYSIS] Calculated score: errors=%d, warnings=%d, conventions=%d",
+            error_count, warning_count, convention_count
+        )
         
         return round(calculated_score, 2)
     
@@ -140,17 +399,8 @@ class AnalysisTools:
             return 0.0
         
         try:
-            # Multiple possible score formats
-            patterns = [
-                r'rated at\s+([0-9.]+)/10',  # "rated at X.XX/10"
-                r'Your code has been rated at\s+([0-9.]+)/10',
-                r'Score:\s+([0-9.]+)/10',
-                r'([0-9.]+)/10',  # Just find any X.XX/10 pattern
-            ]
-            
-            for pattern in patterns:
-                import re
-                match = re.search(pattern, pylint_output)
+            for pattern in _SCORE_PATTERNS:
+                match = pattern.search(pylint_output)
                 if match:
                     score = float(match.group(1))
                     # Ensure it's within valid range
@@ -174,7 +424,7 @@ class AnalysisTools:
                                     pass
         
         except Exception as e:
-            print(f"[ANALYSIS] Error extracting pylint score: {e}")
+            logger.warning("[ANALYSIS] Error extracting pylint score: %s", e)
         
         return 0.0
     
@@ -192,26 +442,65 @@ class AnalysisTools:
                 "line": Optional[int]
             }
         """
+        return self.parse_code(code)[1]
+    
+    def parse_code(self, code: str) -> Tuple[Optional[ast.Module], Dict[str, Any]]:
+        """
+        Parse code once, for callers that check syntax and then walk the tree.
+        
+        Args:
+            code: Python code as string
+        
+        Returns:
+            (AST, or None if the code does not parse; check_syntax result)
+        """
         try:
-            ast.parse(code)
-            return {
+            tree = ast.parse(code)
+            return tree, {
                 "valid": True,
                 "error": None,
                 "line": None
             }
         except SyntaxError as e:
-            return {
+            return None, {
                 "valid": False,
                 "error": str(e),
                 "line": e.lineno
             }
         except Exception as e:
-            return {
+            return None, {
                 "valid": False,
                 "error": str(e),
                 "line": None
             }
     
+    def count_definitions(self, code: str, tree: Optional[ast.AST] = None) -> Dict[str, int]:
+        """
+        Count functions (sync and async) and classes in a single AST walk.
+        
+        Args:
+            code: Python code as string
+            tree: AST of code if already parsed
+        
+        Returns:
+            {"functions": int, "classes": int}, zeros if the code does not parse
+        """
+        functions = 0
+        classes = 0
+        if tree is None:
+            try:
+                tree = ast.parse(code)
+            except Exception:
+                return {"functions": 0, "classes": 0}
+        
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                functions += 1
+            elif isinstance(node, ast.ClassDef):
+                classes += 1
+        
+        return {"functions": functions, "classes": classes}
+    
     def count_functions(self, code: str) -> int:
         """
         Count the number of functions defined in code.
@@ -222,11 +511,7 @@ class AnalysisTools:
         Returns:
             Number of functions
         """
-        try:
-            tree = ast.parse(code)
-            return len([node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)])
-        except:
-            return 0
+        return self.count_definitions(code)["functions"]
     
     def count_classes(self, code: str) -> int:
         """
@@ -238,25 +523,26 @@ class AnalysisTools:
         Returns:
             Number of classes
         """
-        try:
-            tree = ast.parse(code)
-            return len([node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)])
-        except:
-            return 0
+        return self.count_definitions(code)["classes"]
     
-    def get_complexity_estimate(self, code: str) -> str:
+    def get_complexity_estimate(self, code: str, functions: Optional[int] = None,
+                                classes: Optional[int] = None) -> str:
         """
         Estimate code complexity.
         
         Args:
             code: Python code as string
+            functions: Function count if already known
+            classes: Class count if already known
         
         Returns:
             "low", "medium", or "high"
         """
-        lines = len(code.split('\n'))
-        functions = self.count_functions(code)
-        classes = self.count_classes(code)
+        lines = code.count('\n') + 1
+        if functions is None or classes is None:
+            counts = self.count_definitions(code)
+            functions = counts["functions"]
+            classes = counts["classes"]
         
         score = lines / 10 + functions * 2 + classes * 5
         
@@ -3,12 +3,17 @@ File Tools - Sandboxed File Operations
 Provides secure file read/write operations restricted to the sandbox directory.
 """
 
+import logging
 import os
 from pathlib import Path
 from typing import Optional
 import shutil
 
 
+# Tool progress messages; main.py shows them at INFO level
+logger = logging.getLogger("tools")
+
+
 class FileTools:
     """
     Secure file operations with sandbox restrictions.
@@ -24,7 +29,7 @@ class FileTools:
         """
         self.sandbox_dir = Path(sandbox_dir).resolve()
         self.sandbox_dir.mkdir(parents=True, exist_ok=True)
-        print(f"[FILE] File tools initialized with sandbox: {self.sandbox_dir}")
+        logger.info("[FILE] File tools initialized with sandbox: %s", self.sandbox_dir)
     
     def _is_safe_path(self, path: Path) -> bool:
         """
@@ -66,7 +71,7 @@ class FileTools:
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 content = f.read()
-            print(f"[FILE] Read file: {path.name} ({len(content)} chars)")
+            logger.info("[FILE] Read file: %s (%d chars)", path.name, len(content))
             return content
         except Exception as e:
             raise IOError(f"Failed to read {file_path}: {e}")
@@ -98,11 +103,12 @@ class FileTools:
             # Create parent directories
             path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write file
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            # Write file: encode once and write the bytes unbuffered by the
+            # text layer (no newline translation, same bytes on every OS)
+            with open(path, 'wb') as f:
+                f.write(content.encode('utf-8'))
             
-            print(f"[FILE] Wrote file: {path.name} ({len(content)} chars)")
+            logger.info("[FILE] Wrote file: %s (%d chars)", path.name, len(content))
             return True
         
         except Exception as e:
@@ -131,7 +137,7 @@ class FileTools:
         
         # Copy file
         shutil.copy2(source, dest)
-        print(f"[FILE] Copied to sandbox: {source.name}")
+        logger.info("[FILE] Copied to sandbox: %s", source.name)
         
         return str(dest)
     
@@ -169,4 +175,4 @@ class FileTools:
                 item.unlink()
             elif item.is_dir():
                 shutil.rmtree(item)
-        print("[FILE] Sandbox cleared")
\ No newline at end of file
+        logger.info("[FILE] Sandbox cleared")
\ No newline at end of file
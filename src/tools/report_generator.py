@@ -6,9 +6,12 @@ SANS dépendances complexes - fonctionne directement.
 
 import json
 import os
+from collections import Counter
 from datetime import datetime
 from typing import Dict, Any, List
 
+from src.utils.logger import flush_logs
+
 
 class ReportGenerator:
     """
@@ -35,6 +38,11 @@ class ReportGenerator:
     
     def _load_logs(self) -> bool:
         """Charger les logs depuis le fichier."""
+        # Entrées encore en file chez le logger : les écrire avant la lecture
+        try:
+            flush_logs()
+        except Exception as e:
+            print(f"[REPORT] Logs récents non écrits: {e}")
         try:
             if os.path.exists(self.log_file):
                 with open(self.log_file, 'r') as f:
@@ -228,7 +236,7 @@ class ReportGenerator:
             return report
         
         # Extraire timeline
-        agent_counts = {}
+        agent_counts = Counter()
         action_sequence = []
         
         for i, log in enumerate(self.logs):
@@ -243,7 +251,7 @@ class ReportGenerator:
             
             # Distribution d'agents
             agent = log.get("agent", "UNKNOWN")
-            agent_counts[agent] = agent_counts.get(agent, 0) + 1
+            agent_counts[agent] += 1
             
             # Séquence d'actions
             action = log.get("action", "UNKNOWN")
@@ -263,7 +271,7 @@ class ReportGenerator:
                 "action": self.logs[-1].get("action")
             }
         
-        report["metrics"]["agent_distribution"] = agent_counts
+        report["metrics"]["agent_distribution"] = dict(agent_counts)
         report["metrics"]["action_sequence"] = action_sequence
         
         return report
@@ -3,6 +3,7 @@ Test Tools - Pytest Integration
 Provides utilities for running tests on Python code.
 """
 
+import logging
 import subprocess
 import tempfile
 import os
@@ -10,6 +11,10 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 
 
+# Tool progress messages; main.py shows them at INFO level
+logger = logging.getLogger("tools")
+
+
 class TestTools:
     """
     Tools for running tests on Python code.
@@ -17,7 +22,7 @@ class TestTools:
     
     def __init__(self):
         """Initialize test tools."""
-        print("[TEST] Test tools initialized")
+        logger.info("[TEST] Test tools initialized")
     
     def run_pytest(self, file_path: str, test_file_path: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -70,7 +75,7 @@ class TestTools:
             failures = self._extract_failures(output)
             errors = self._extract_errors(output)
             
-            print(f"[TEST] Tests: {tests_run} run, {len(failures)} failed")
+            logger.info("[TEST] Tests: %d run, %d failed", tests_run, len(failures))
             
             return {
                 "passed": passed,
@@ -166,7 +171,7 @@ def test_no_syntax_errors():
         with open(test_file, 'w', encoding='utf-8') as f:
             f.write(test_content)
         
-        print(f"[TEST] Generated basic test: {test_file.name}")
+        logger.info("[TEST] Generated basic test: %s", test_file.name)
         
         return str(test_file)
     
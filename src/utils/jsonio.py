@@ -0,0 +1,48 @@
+"""
+JSON helpers shared by the agents, tools and logger.
+
+orjson is used when installed; the json fallback is configured to produce
+the same bytes (UTF-8, no ASCII escaping, 2-space indent) so files written
+on disk do not depend on which backend is available.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _INDENT_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Decode a JSON document from bytes or str."""
+        return orjson.loads(data)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize obj as compact UTF-8 JSON."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def dumps_indent_bytes(obj: Any) -> bytes:
+        """Serialize obj as UTF-8 JSON with a 2-space indent."""
+        return orjson.dumps(obj, option=_INDENT_OPTIONS)
+else:
+    def loads(data: Union[bytes, str]) -> Any:
+        """Decode a JSON document from bytes or str."""
+        return json.loads(data)
+
+    def dumps_bytes(obj: Any) -> bytes:
+        """Serialize obj as compact UTF-8 JSON."""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def dumps_indent_bytes(obj: Any) -> bytes:
+        """Serialize obj as UTF-8 JSON with a 2-space indent."""
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_indent(obj: Any) -> str:
+    """Pretty-print obj as a JSON string (2-space indent)."""
+    return dumps_indent_bytes(obj).decode("utf-8")
+
@@ -1,12 +1,29 @@
+import atexit
 import json
 import os
+import queue
+import threading
 import uuid
 from datetime import datetime
 from enum import Enum
 
+# Import relatif : le logger est importé aussi bien en `src.utils.logger`
+# qu'en `utils.logger` (src/ ajouté au sys.path par les tests)
+from .jsonio import loads as _json_loads, dumps_bytes as _dump_entry
+
 # Chemin du fichier de logs
 LOG_FILE = os.path.join("logs", "experiment_data.json")
 
+# Écriture différée : les entrées validées sont mises en file et écrites par
+# lots par un thread d'arrière-plan (une lecture/réécriture du fichier par lot)
+_LOG_BATCH_SIZE = 50
+_LOG_FLUSH_INTERVAL = 0.1  # secondes
+_log_queue: "queue.Queue[dict]" = queue.Queue()
+_writer_lock = threading.Lock()
+_writer_thread = None
+# Première erreur d'écriture du thread, relevée par le prochain flush_logs()
+_write_error = None
+
 class ActionType(str, Enum):
     """
     Énumération des types d'actions possibles pour standardiser l'analyse.
@@ -16,6 +33,12 @@ class ActionType(str, Enum):
     DEBUG = "DEBUG"             # Analyse d'erreurs d'exécution
     FIX = "FIX"                 # Application de correctifs
 
+# Calculés une fois : valeurs acceptées et actions exigeant prompt et réponse
+_VALID_ACTIONS = frozenset(a.value for a in ActionType)
+_PROMPT_REQUIRED_ACTIONS = frozenset(
+    a.value for a in (ActionType.ANALYSIS, ActionType.GENERATION, ActionType.DEBUG, ActionType.FIX)
+)
+
 def log_experiment(agent_name: str, model_used: str, action: ActionType, details: dict, status: str):
     """
     Enregistre une interaction d'agent pour l'analyse scientifique.
@@ -28,15 +51,15 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
         status (str): "SUCCESS" ou "FAILURE".
 
     Raises:
-        ValueError: Si les champs obligatoires sont manquants dans 'details' ou si l'action est invalide.
+        ValueError: Si les champs obligatoires sont manquants dans 'details', si l'action est invalide
+            ou si 'details' n'est pas sérialisable en JSON.
     """
     
     # --- 1. VALIDATION DU TYPE D'ACTION ---
     # Permet d'accepter soit l'objet Enum, soit la chaîne de caractères correspondante
-    valid_actions = [a.value for a in ActionType]
     if isinstance(action, ActionType):
         action_str = action.value
-    elif action in valid_actions:
+    elif action in _VALID_ACTIONS:
         action_str = action
     else:
         raise ValueError(f"❌ Action invalide : '{action}'. Utilisez la classe ActionType (ex: ActionType.FIX).")
@@ -44,7 +67,7 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
     # --- 2. VALIDATION STRICTE DES DONNÉES (Prompts) ---
     # Pour l'analyse scientifique, nous avons absolument besoin du prompt et de la réponse
     # pour les actions impliquant une interaction majeure avec le code.
-    if action_str in [ActionType.ANALYSIS, ActionType.GENERATION, ActionType.DEBUG, ActionType.FIX]:
+    if action_str in _PROMPT_REQUIRED_ACTIONS:
         required_keys = ["input_prompt", "output_response"]
         missing_keys = [key for key in required_keys if key not in details]
         
@@ -56,9 +79,6 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
             )
 
     # --- 3. PRÉPARATION DE L'ENTRÉE ---
-    # Création du dossier logs s'il n'existe pas
-    os.makedirs("logs", exist_ok=True)
-    
     entry = {
         "id": str(uuid.uuid4()),  # ID unique pour éviter les doublons lors de la fusion des données
         "timestamp": datetime.now().isoformat(),
@@ -69,21 +89,145 @@ def log_experiment(agent_name: str, model_used: str, action: ActionType, details
         "status": status
     }
 
-    # --- 4. LECTURE & ÉCRITURE ROBUSTE ---
+    # --- 4. SÉRIALISATION ---
+    # Faite ici et non dans le thread d'écriture : une entrée non sérialisable
+    # lève l'erreur chez l'appelant, et la copie mise en file ne suit plus
+    # les modifications ultérieures de 'details' par l'agent.
+    try:
+        entry = _json_loads(_dump_entry(entry))
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            f"❌ Erreur de Logging (Agent: {agent_name}) : 'details' n'est pas sérialisable en JSON ({e})."
+        ) from e
+
+    # --- 5. MISE EN FILE (écriture par le thread d'arrière-plan) ---
+    _log_queue.put(entry)
+    _ensure_writer()
+
+
+def flush_logs():
+    """
+    Attend que toutes les entrées en file soient écrites dans LOG_FILE.
+    À appeler avant de lire LOG_FILE ; appelée aussi à la sortie du programme.
+
+    Raises:
+        OSError: Si une écriture a échoué depuis le dernier appel ; c'est
+            l'exception d'origine qui est relevée (les entrées du lot sont perdues).
+    """
+    global _write_error
+    if _writer_thread is not None and _writer_thread.is_alive():
+        _log_queue.join()
+        error, _write_error = _write_error, None
+        if error is not None:
+            raise error
+        return
+    
+    # Pas de thread d'écriture : on vide la file directement
+    entries = []
+    while True:
+        try:
+            entries.append(_log_queue.get_nowait())
+        except queue.Empty:
+            break
+    if entries:
+        try:
+            _write_entries(entries)
+        finally:
+            for _ in entries:
+                _log_queue.task_done()
+
+
+def _ensure_writer():
+    """Démarre le thread d'écriture au premier log."""
+    global _writer_thread
+    if _writer_thread is None or not _writer_thread.is_alive():
+        with _writer_lock:
+            if _writer_thread is None or not _writer_thread.is_alive():
+                _writer_thread = threading.Thread(
+                    target=_writer_loop, name="experiment-logger", daemon=True
+                )
+                _writer_thread.start()
+
+
+def _writer_loop():
+    """Regroupe les entrées (jusqu'à _LOG_BATCH_SIZE ou _LOG_FLUSH_INTERVAL) et les écrit."""
+    global _write_error
+    while True:
+        entries = [_log_queue.get()]
+        while len(entries) < _LOG_BATCH_SIZE:
+            try:
+                entries.append(_log_queue.get(timeout=_LOG_FLUSH_INTERVAL))
+            except queue.Empty:
+                break
+        try:
+            _write_entries(entries)
+        except Exception as e:
+            # Conservée pour flush_logs() : le thread n'a pas d'appelant
+            if _write_error is None:
+                _write_error = e
+        finally:
+            for _ in entries:
+                _log_queue.task_done()
+
+
+def _dump_log(data: list) -> bytes:
+    """
+    Sérialise la liste des entrées au format historique du fichier de logs
+    (indentation de 4, UTF-8 sans échappement ASCII) ; orjson n'offre pas
+    d'indentation de 4, le format sur disque ne dépend donc pas de lui.
+    """
+    return json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+
+
+def _write_entries(entries: list):
+    """
+    Ajoute des entrées au fichier de logs (lecture, ajout, réécriture).
+
+    Args:
+        entries (list): Entrées préparées par log_experiment.
+    """
+    # Création du dossier logs s'il n'existe pas
+    os.makedirs("logs", exist_ok=True)
+
+    # --- LECTURE & ÉCRITURE ROBUSTE ---
     data = []
     if os.path.exists(LOG_FILE):
         try:
-            with open(LOG_FILE, 'r', encoding='utf-8') as f:
+            with open(LOG_FILE, 'rb') as f:
                 content = f.read().strip()
                 if content: # Vérifie que le fichier n'est pas juste vide
-                    data = json.loads(content)
-        except json.JSONDecodeError:
+                    data = _json_loads(content)
+        except (json.JSONDecodeError, UnicodeDecodeError):
             # Si le fichier est corrompu, on repart à zéro (ou on pourrait sauvegarder un backup)
             print(f"⚠️ Attention : Le fichier de logs {LOG_FILE} était corrompu. Une nouvelle liste a été créée.")
             data = []
 
-    data.append(entry)
+    data.extend(entries)
     
     # Écriture
-    with open(LOG_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+    try:
+        payload = _dump_log(data)
+    except (TypeError, ValueError):
+        # Une entrée invalide ne doit pas faire perdre tout le lot
+        valid = []
+        for entry in entries:
+            try:
+                _dump_entry(entry)
+                valid.append(entry)
+            except (TypeError, ValueError) as e:
+                print(f"⚠️ Attention : Entrée de log ignorée (agent {entry.get('agent')}) : {e}")
+        data[len(data) - len(entries):] = valid
+        payload = _dump_log(data)
+    with open(LOG_FILE, 'wb') as f:
+        f.write(payload)
+
+
+def _flush_at_exit():
+    """Vide la file à la sortie ; une erreur d'écriture est seulement signalée."""
+    try:
+        flush_logs()
+    except Exception as e:
+        print(f"⚠️ Attention : Écriture des logs impossible : {e}")
+
+
+atexit.register(_flush_at_exit)
@@ -16,8 +16,8 @@ _fixer = None
 _judge = None
 
 
-def _get_auditor() -> AuditorAgent:
-    """Get or create the Auditor agent."""
+def get_auditor() -> AuditorAgent:
+    """Get or create the Auditor agent shared by the audit node and the orchestrator."""
     global _auditor
     if _auditor is None:
         _auditor = AuditorAgent()
@@ -56,7 +56,7 @@ def audit_node(state: WorkflowState) -> Dict[str, Any]:
     print("[AUDIT] STATION 1: AUDIT")
     print("="*60)
     
-    auditor = _get_auditor()
+    auditor = get_auditor()
     updates = auditor.execute(state)
     
     updates["current_phase"] = "fix"
@@ -136,7 +136,6 @@ def error_node(state: WorkflowState) -> Dict[str, Any]:
     return {
         "current_phase": "error",
         "agent_outputs": {
-            **(state.get("agent_outputs") or {}),
             "final_status": "FAILED - Max iterations"
         }
     }
\ No newline at end of file
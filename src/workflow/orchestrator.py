@@ -3,11 +3,14 @@ Refactoring Orchestrator
 Coordinates the processing of multiple files through the workflow.
 """
 
+import asyncio
 import os
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 from .graph import create_refactoring_graph
+from .nodes import get_auditor
 from .state import WorkflowState
+from src.utils.logger import flush_logs
 
 
 class RefactoringOrchestrator:
@@ -15,14 +18,22 @@ class RefactoringOrchestrator:
     Main orchestrator that processes all Python files in a directory.
     """
     
-    def __init__(self, max_iterations: int = 10):
+    def __init__(self, max_iterations: int = 10, audit_concurrency: int = 4,
+                 audit_batch_size: Optional[int] = None):
         """
         Initialize the orchestrator.
         
         Args:
             max_iterations: Maximum fix-test iterations per file
+            audit_concurrency: Maximum initial audits in flight at once
+            audit_batch_size: Files per initial audit LLM call (defaults to
+                the AUDITOR_BATCH_SIZE environment variable, or 4)
         """
         self.max_iterations = max_iterations
+        self.audit_concurrency = audit_concurrency
+        if audit_batch_size is None:
+            audit_batch_size = int(os.environ.get("AUDITOR_BATCH_SIZE", "4"))
+        self.audit_batch_size = max(1, audit_batch_size)
         self.graph = create_refactoring_graph()
         print(f"Orchestrator initialized (max iterations: {max_iterations})")
     
@@ -64,6 +75,12 @@ class RefactoringOrchestrator:
         
         print(f"Found {len(python_files)} Python file(s)")
         
+        # Initial audits are independent LLM calls: batch them and run the
+        # batches concurrently so each file's audit step below is served
+        # from the verdict cache
+        if len(python_files) > 1 and (self.audit_concurrency > 1 or self.audit_batch_size > 1):
+            self._prefetch_audits(python_files)
+        
         # Process each file
         results = []
         for i, file_path in enumerate(python_files, 1):
@@ -80,6 +97,10 @@ class RefactoringOrchestrator:
             else:
                 print(f"{Path(file_path).name} - FAILED")
         
+        # Experiment log entries are written by a background thread; a write
+        # failure is raised here rather than lost at interpreter exit
+        flush_logs()
+        
         # Calculate summary
         success_count = len([r for r in results if r["success"]])
         fail_count = len(results) - success_count
@@ -100,6 +121,70 @@ class RefactoringOrchestrator:
             "details": results
         }
     
+    def _prefetch_audits(self, python_files: List[str]):
+        """
+        Audit all files concurrently, audit_batch_size files per LLM call
+        (AuditorAgent.execute_batch), single files with execute_async.
+        Inside a running event loop, AuditorAgent.execute_many is used instead.
+        Pylint runs once over all the files first (AuditorAgent.prefetch_pylint).
+        
+        Failures are ignored here: the workflow audits that file again.
+        
+        Args:
+            python_files: Files to audit
+        """
+        size = self.audit_batch_size
+        batches = [python_files[i:i + size] for i in range(0, len(python_files), size)]
+        print(f"Pre-auditing {len(python_files)} file(s) in {len(batches)} request(s) "
+              f"({self.audit_concurrency} concurrent)...")
+        auditor = get_auditor()
+        
+        def initial_state(path: str) -> Dict:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            return {
+                "current_file": path,
+                "file_content": content,
+                "agent_outputs": {},
+                "errors": []
+            }
+        
+        states = []
+        for path in python_files:
+            try:
+                states.append(initial_state(path))
+            except OSError:
+                continue
+        auditor.prefetch_pylint(states)
+        by_path = {state["current_file"]: state for state in states}
+        
+        async def audit(paths: List[str], semaphore: asyncio.Semaphore):
+            async with semaphore:
+                group = [by_path[path] for path in paths if path in by_path]
+                if len(group) == 1:
+                    return await auditor.execute_async(group[0])
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, auditor.execute_batch, group)
+        
+        async def audit_all():
+            semaphore = asyncio.Semaphore(self.audit_concurrency)
+            return await asyncio.gather(
+                *(audit(paths, semaphore) for paths in batches),
+                return_exceptions=True
+            )
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            asyncio.run(audit_all())
+            return
+        
+        # Already inside an event loop: overlap the calls on threads instead
+        try:
+            auditor.execute_many(states, self.audit_concurrency, size)
+        except Exception as e:
+            print(f"Audit prefetch stopped: {e}")
+    
     def _get_python_files(self, directory: str) -> List[str]:
         """
         Find all Python files in directory (recursively).
@@ -3,7 +3,32 @@ Workflow State Definition
 This defines the "shared whiteboard" that all agents read and write to.
 """
 
-from typing import TypedDict, List, Dict, Any, Optional, Literal
+from typing import Annotated, TypedDict, List, Dict, Any, Optional, Literal
+
+
+def merge_agent_outputs(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    LangGraph reducer for agent_outputs: nodes return only the keys they set.
+    
+    Merges in place, so each step costs O(len(update)) rather than a copy
+    of every output so far. This is safe because the channel owns current:
+    LangGraph's aggregate channel starts from its own empty dict and merges
+    the initial state's agent_outputs into it, the orchestrator builds a
+    fresh agent_outputs dict for every file, and the graph is compiled
+    without a checkpointer that could share the value.
+    
+    Args:
+        current: Accumulated agent outputs (owned by the channel)
+        update: Keys returned by a node
+    
+    Returns:
+        current, updated with update
+    """
+    if current is None:
+        return dict(update or {})
+    if update:
+        current.update(update)
+    return current
 
 
 class WorkflowState(TypedDict):
@@ -35,7 +60,7 @@ class WorkflowState(TypedDict):
     retry_count: int  # Number of fix-test retry attempts
     
     # === FLEXIBLE STORAGE ===
-    agent_outputs: Dict[str, Any]  # Additional agent data
+    agent_outputs: Annotated[Dict[str, Any], merge_agent_outputs]  # Additional agent data (merged)
     
     # === OVERALL RESULTS ===
     processed_files: List[str]  # Files that have been processed
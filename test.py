@@ -70,6 +70,13 @@ print("\n2. LOGGING VERIFICATION")
 print("-" * 30)
 
 log_file = "logs/experiment_data.json"
+try:
+    # Entries are written by a background thread: wait for them
+    from src.utils.logger import flush_logs
+    flush_logs()
+except Exception as e:
+    print(f"Could not write pending log entries: {e}")
+
 if os.path.exists(log_file):
     with open(log_file, 'r') as f:
         logs = json.load(f)